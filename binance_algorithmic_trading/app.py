@@ -1,22 +1,53 @@
 #!python3
 import logging
+import argparse
+import importlib
+import pandas as pd
 from pprint import pprint
 from datetime import datetime, timedelta
 from binance_algorithmic_trading.logger import Logger
 from binance_algorithmic_trading.config import get_config
 from binance_algorithmic_trading.database_manager import DatabaseManager
-from binance_algorithmic_trading.client_manager import ClientManager
-from binance_algorithmic_trading.strategies.EMAX_strategy import EMAXStrategy
+from binance_algorithmic_trading.client_manager import (ClientManager,
+                                                        ClientInitError)
 
 
-def main():
+def get_strategy_class(strategy_name):
     '''
-    Description
+    Import and return the strategy class for a given strategy name.
 
-    Summary
+    Strategies are defined in strategies/<name>_strategy.py as a class named
+    <name>Strategy, e.g. strategies/EMAX_strategy.py defines EMAXStrategy.
+    Only the module of the chosen strategy is imported, such that unused
+    strategies (and their compiled kernels) are not loaded. Names may be
+    dotted to select strategies in subpackages, e.g. 'proprietary.NAME'.
+    '''
+    module = importlib.import_module(
+        f"binance_algorithmic_trading.strategies.{strategy_name}_strategy")
+    return getattr(module, f"{strategy_name.split('.')[-1]}Strategy")
 
-    Args
 
+def main(strategy_name, params, entry_interval, trade_interval, html,
+         workers=None):
+    '''
+    Update the klines database and backtest a strategy.
+
+    Parameters
+    ----------
+    strategy_name: str
+        Name of the strategy to backtest, see get_strategy_class
+    params: str
+        Strategy parameters, formatted as required by the strategy
+    entry_interval: str
+        Klines interval used to find trade entries
+    trade_interval: str
+        Klines interval used to manage trades
+    html: bool
+        Whether to render the backtest trade log to HTML for review
+    workers: int
+        Number of worker processes to backtest symbols in parallel, each
+        starting from the starting capital, or None to backtest symbols in
+        sequence carrying the capital over
     '''
     # Get config options
     config = get_config()
@@ -25,7 +56,7 @@ def main():
     # using the API key/secret from app.cfg
     client_manager = ClientManager(
         log_level=logging.DEBUG,
-        config=config['binance']
+        config=config.binance
     )
 
     # Get binance exchange info
@@ -34,26 +65,28 @@ def main():
     # Initialise database
     database_manager = DatabaseManager(
         log_level=logging.DEBUG,
-        config=config['database']
+        config=config.database
     )
 
     # Update database with all new data from binance
     # for the symbols and intervals enabled in the config file
     database_manager.update_klines(
-        symbols=config['binance']['SYMBOLS'],
-        intervals=config['binance']['INTERVALS'],
+        symbols=config.binance.SYMBOLS,
+        intervals=config.binance.INTERVALS,
         client_manager=client_manager
     )
 
+    # Shut down the client manager threads before the backtest forks
+    # worker processes
+    client_manager.close()
+
     # Configure start and end time for backtesting
     end_time = datetime.now()
     start_time = end_time - timedelta(days=3650)
 
-    # Initialise EMA Crossover Strategy
-    EMA_fast = 20
-    EMA_slow = 50
-    params = f"{EMA_fast}:{EMA_slow}"
-    strategy = EMAXStrategy(
+    # Initialise the strategy
+    strategy_class = get_strategy_class(strategy_name)
+    strategy = strategy_class(
         log_level=logging.DEBUG,
         database_manager=database_manager,
         params=params
@@ -63,31 +96,65 @@ def main():
     results = strategy.backtest(
         starting_capital=10000,
         risk_percentage=100,
-        symbols=config['binance']['SYMBOLS'],
+        symbols=config.binance.SYMBOLS,
         start_time=start_time,
         end_time=end_time,
-        entry_interval='12h',
-        trade_interval='30m',
-        use_BNB_for_commission=True
+        entry_interval=entry_interval,
+        trade_interval=trade_interval,
+        use_BNB_for_commission=True,
+        max_workers=workers,
+        trade_log_path='data/backtest_trades.jsonl'
     )
 
     # Save the backtest results
     database_manager.save_backtest(results)
 
-    # Save the backtest trade log to file for review
-    trade_log = strategy.get_trade_log()
-    trade_log.to_html('data/backtest_trades.html')
+    # Render the backtest trade log written during the backtest for review
+    if html:
+        trade_log = pd.read_json('data/backtest_trades.jsonl', lines=True)
+        with open('data/backtest_trades.html', 'w') as f:
+            trade_log.to_html(f, render_links=False)
 
     pprint(results, sort_dicts=False)
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Update the klines database and backtest a strategy")
+    parser.add_argument('--strategy', default='EMAX',
+                        help="strategy name, e.g. 'EMAX'")
+    parser.add_argument('--params', default='20:50',
+                        help="strategy parameters, e.g. '20:50' for EMAX")
+    parser.add_argument('--entry-interval', default='12h',
+                        help="klines interval used to find trade entries")
+    parser.add_argument('--trade-interval', default='30m',
+                        help="klines interval used to manage trades")
+    parser.add_argument('--html', action='store_true',
+                        help="render the backtest trade log to HTML")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="backtest symbols in parallel worker processes, "
+                             "each starting from the starting capital")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
+    args = parse_args()
+
     # Initialise logger
     logger = Logger(logger_name=__file__, log_level=logging.DEBUG).get_logger()
 
     # Run main and allow stopping with CTRL-C (KeyboardInterrupt)
     try:
         logger.info("application started")
-        main()
+        main(
+            strategy_name=args.strategy,
+            params=args.params,
+            entry_interval=args.entry_interval,
+            trade_interval=args.trade_interval,
+            html=args.html,
+            workers=args.workers
+        )
     except KeyboardInterrupt:
         logger.info("keyboard interrupt detected, exiting application")
+    except ClientInitError:
+        logger.critical("exiting application due to error")
@@ -1,9 +1,71 @@
 import binance
-import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+import numpy as np
+import heapq
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from binance.spot import Spot as Client
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
 from binance_algorithmic_trading.logger import Logger
 
+# Local timezone info, only looked up once
+_local_time_zone = datetime.now().astimezone().tzinfo
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_response_hook(response, *args, **kwargs):
+    # Parse response bodies with orjson when the Binance client calls
+    # response.json(), note orjson errors are a subclass of ValueError as
+    # expected by the client
+    response.json = lambda **_: orjson.loads(response.content)
+    return response
+
+
+class ClientInitError(RuntimeError):
+    '''
+    Raised when the Binance client of a ClientManager can't be initialised.
+    '''
+
+
+# Cache the Binance client for each connection config, such that client
+# managers with the same config share one client and its connection pool
+@lru_cache(maxsize=4)
+def _get_spot_client(base_url, api_key, api_secret, timeout,
+                     show_limit_usage, max_connections):
+    client = Client(
+        base_url=base_url,
+        api_key=api_key,
+        api_secret=api_secret,
+        timeout=timeout,
+        show_limit_usage=show_limit_usage
+    )
+
+    # Keep a persistent connection open for each concurrent request, the
+    # default pool of 10 connections would otherwise close and reopen
+    # (TLS handshake) connections when more requests run concurrently.
+    # Retries are left to the client manager rate limit handling
+    adapter = HTTPAdapter(pool_connections=max_connections,
+                          pool_maxsize=max_connections,
+                          max_retries=0)
+    client.session.mount('https://', adapter)
+    client.session.mount('http://', adapter)
+    client.session.headers['Connection'] = 'keep-alive'
+
+    # Use orjson for parsing Binance responses if it is installed
+    if orjson is not None:
+        client.session.hooks['response'].append(_orjson_response_hook)
+
+    return client
+
 
 class ClientManager():
     '''
@@ -29,12 +91,139 @@ class ClientManager():
         Initialise the client manager and Binance Spot API client
     get_exchange_info(symbols, permissions)
         Request exchange info for list of symbols and handle the response data
+    refresh_exchange_info()
+        Request exchange info even if the cached exchange info is valid
     get_depth(symbol, limit)
         Request depth for a given symbol
     get_klines(symbol, interval, start_time, end_time, limit)
         Request klines for a given symbol and interval between two times
+    get_klines_batch(requests, max_workers)
+        Request klines for multiple symbol/interval windows concurrently
+    iter_klines_batch(requests, max_workers)
+        Request klines for multiple windows concurrently, yielding results
+    submit_klines(symbol, interval, start_time, end_time, limit)
+        Request klines in the shared thread pool without blocking
+    close()
+        Shut down the shared thread pool
     '''
 
+    # Instance attributes, declared such that instances store them in fixed
+    # slots rather than a per-instance dict
+    __slots__ = (
+        'config',
+        'client',
+        'exchange_info',
+        'symbols',
+        '_exchange_info_expiry_monotonic',
+        '_timeout',
+        '_show_limit_usage',
+        '_local_time_zone',
+        '_logger',
+        '_executor',
+        '_lock',
+        '_x_mbx_used_weight',
+        '_x_mbx_used_weight_1m',
+        '_used_weight_1m_minute',
+        '_weight_window',
+        '_weight_window_total',
+        '_weight_budget_1m',
+        '_reserved_weight_ratios',
+        '_restart_monotonic',
+        '_client_error_attempt',
+        '_client_error_retry_wait_time_s',
+        '_client_error_http_status_code',
+        '_client_error_code',
+        '_client_error_message',
+        '_client_error_header',
+        '_client_error_error_data'
+    )
+
+    # Request weight budget per minute for the Binance spot API
+    # See https://binance-docs.github.io/apidocs/spot/en/#limits
+    _max_weight_budget_1m = 1200
+
+    # The weight budget used by the client adapts to the server load using
+    # additive increase and multiplicative decrease (AIMD). The budget is
+    # multiplied by the decrease ratio on too many requests and server
+    # overloaded errors and increased after each successful request, such
+    # that the request rate stays near the limit rather than alternating
+    # between waiting out errors and making requests at the full budget
+    _min_weight_budget_1m = 60
+    _weight_budget_increase = 0.5
+    _weight_budget_decrease_ratio = 0.5
+
+    # Error codes and HTTP status codes for which the budget is decreased
+    _overload_error_codes = (-1003, -1008)
+    _overload_status_codes = (418, 429)
+
+    # Fraction of the weight budget the client uses before waiting, leaving
+    # headroom for weight used by other clients on the same IP
+    _weight_safety_ratio = 0.9
+
+    # Keys of the used weights and data in Binance client results
+    _limit_usage_keys = ('x-mbx-used-weight', 'x-mbx-used-weight-1m')
+    _data_key = 'data'
+
+    # Request weight of each endpoint
+    _endpoint_weights = {
+        'klines': 2,
+        'exchange_info': 20
+    }
+
+    # Request weight per minute, of the maximum weight budget, reserved for
+    # each endpoint so that bursts of other requests, e.g. klines updates,
+    # don't starve it. Reserves scale with the weight budget
+    _endpoint_weight_reserves_1m = {
+        'depth': 200
+    }
+
+    # Request weight of a depth request for the maximum limit of each range
+    # See https://binance-docs.github.io/apidocs/spot/en/#order-book
+    _depth_weights = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+
+    # Seconds for which exchange info is cached, as it rarely changes
+    _exchange_info_ttl_s = 600
+
+    # Number of persistent HTTPS connections kept open to Binance, at least
+    # the number of concurrent requests made by get_klines_batch
+    _max_connections = 32
+
+    # Number of threads making concurrent requests in the shared thread pool
+    _max_workers = 8
+
+    # Exponential backoff of transient client errors, the wait time before
+    # the next request is a random time of up to the base wait time doubled
+    # for each consecutive error (full jitter), with the number of doublings
+    # capped
+    _backoff_base_wait_time_s = 0.5
+    _backoff_max_attempts = 5
+
+    # Warnings for the HTTP status codes of too many requests errors
+    _rate_limit_warnings = {
+        # IP banned
+        418: "client made too many requests, IP banned until %s",
+        # Too many requests, warning before IP ban
+        429: "client made too many requests, waiting until %s to avoid IP ban"
+    }
+
+    # Column indexes of the Binance kline data format
+    # See https://binance-docs.github.io/apidocs/spot/en/#kline-candlestick-data
+    _klines_int_columns = {
+        'open_time': 0,
+        'close_time': 6,
+        'num_trades': 8
+    }
+    _klines_float_columns = {
+        'open': 1,
+        'high': 2,
+        'low': 3,
+        'close': 4,
+        'volume': 5,
+        'quote_asset_volume': 7,
+        'taker_buy_base_asset_volume': 9,
+        'taker_buy_quote_asset_volume': 10
+    }
+
     def __init__(self, log_level, config):
         '''
         Initialise the client manager and Binance Spot API client.
@@ -43,62 +232,89 @@ class ClientManager():
         ----------
         log_level: int
             The logging level as specified in the logging module
-        config: Dict
-            Dictionary containing the configuration settings for the Binance
-            client connection, including API key and secret
+        config: BinanceConfig
+            The configuration settings for the Binance client connection,
+            including API key and secret
+
+        Raises
+        ------
+        ClientInitError
+            If the Binance client could not be initialised
         '''
         self.config = config
         self.exchange_info = None
-        self.symbols = []
+        self._exchange_info_expiry_monotonic = 0.0
+        self.symbols = config.SYMBOLS
         self._x_mbx_used_weight = 0
         self._x_mbx_used_weight_1m = 0
-        self._timeout = 5
-        self._show_limit_usage = True
-        self._local_time_zone = None
+        self._timeout = config.TIMEOUT
+        self._show_limit_usage = config.SHOW_LIMIT_USAGE
         self._client_error_retry_wait_time_s = 0
-        self._client_error_restart_time = 0
+        self._restart_monotonic = 0.0
+        self._client_error_attempt = 0
+
+        # Shared state for rate limiting concurrent requests. The lock guards
+        # the weight and client error attributes, and the weight window holds
+        # the (monotonic time, weight) of each request made in the last
+        # minute, with the used weight reported by Binance for the current
+        # minute tracked separately
+        self._lock = threading.RLock()
+        self._weight_window = deque()
+        self._weight_window_total = 0
+        self._weight_budget_1m = self._max_weight_budget_1m
+        self._used_weight_1m_minute = None
+
+        # Fraction of the weight budget each endpoint can't use as it is
+        # reserved for other endpoints
+        self._reserved_weight_ratios = {
+            endpoint: sum(
+                reserve for reserved_endpoint, reserve
+                in self._endpoint_weight_reserves_1m.items()
+                if reserved_endpoint != endpoint
+            ) / self._max_weight_budget_1m
+            for endpoint in ('klines', 'depth', 'exchange_info')
+        }
+
+        # Thread pool shared by all concurrent requests, such that the
+        # number of blocking requests is bounded across batches
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix='binance-io')
 
         # Initialise logger for client manager
         self._logger = Logger(logger_name=__file__,
                               log_level=log_level).get_logger()
 
-        try:
-            # Cast config string values to required types
-            timeout = int(config['TIMEOUT'])
-            show_limit_usage = bool(config['SHOW_LIMIT_USAGE'] == 'TRUE')
-            symbols = json.loads(config["SYMBOLS"])
-        except Exception as e:
-            self._logger.warning("invalid optional binance config value(s) in "
-                                 "app.cfg, default values will be used, "
-                                 f"error: {e}")
-        else:
-            self._timeout = timeout
-            self._show_limit_usage = show_limit_usage
-            self.symbols = symbols
-            self._logger.debug("loaded config options for binance client")
-
         # Getting local timezone info
-        self._local_time_zone = datetime.now().astimezone().tzinfo
+        self._local_time_zone = _local_time_zone
 
         # Initialise binance API client
         # API key/secret are required for user data endpoints
         try:
-            self.client = Client(
-                base_url=self.config['BASE_URL'],
-                api_key=self.config['API_KEY'],
-                api_secret=self.config['SECRET_KEY'],
-                timeout=self._timeout,
-                show_limit_usage=self._show_limit_usage
+            self.client = _get_spot_client(
+                self.config.BASE_URL,
+                self.config.API_KEY,
+                self.config.SECRET_KEY,
+                self._timeout,
+                self._show_limit_usage,
+                self._max_connections
             )
         except Exception as e:
             self._logger.critical(f"failed to initialise binance client: {e}")
-            self._logger.critical("exiting application due to error")
-            exit()
+            self._executor.shutdown(wait=False)
+            raise ClientInitError(
+                f"failed to initialise binance client: {e}") from e
         else:
             self._logger.info("connected to binance")
 
     def get_exchange_info(self):
 
+        # Return the cached exchange info if it hasn't expired
+        if (self.exchange_info is not None
+                and time.monotonic() < self._exchange_info_expiry_monotonic):
+            return self.exchange_info
+
+        self._acquire_weight(self._endpoint_weights['exchange_info'],
+                             'exchange_info')
         if self._can_make_request():
             try:
                 # Get exchange info for given symbols and permissions, if any
@@ -107,18 +323,33 @@ class ClientManager():
                 self._handle_client_error(e)
             else:
                 self._logger.info("retrieved binance exchange information")
+                self._on_request_success()
+
                 # Update limit weights
-                if 'limit_usage' in result:
-                    self._update_weights(result['limit_usage'])
-                if 'data' in result:
-                    self.exchange_info = result['data']
+                limit_usage = result.get('limit_usage')
+                if limit_usage is not None:
+                    self._update_weights(limit_usage)
+                data = result.get(self._data_key)
+                if data is not None:
+                    self.exchange_info = data
+                    self._exchange_info_expiry_monotonic = (
+                        time.monotonic() + self._exchange_info_ttl_s)
         else:
             self._logger.warning("server request limit reached, need to wait "
-                                f"until {self._client_error_restart_time}, "
-                                "skipping action")
+                                 "until %s, skipping action",
+                                 self._get_restart_time())
+
+        return self.exchange_info
+
+    def refresh_exchange_info(self):
+
+        # Expire the cached exchange info and request it again
+        self._exchange_info_expiry_monotonic = 0.0
+        return self.get_exchange_info()
 
     def get_depth(self, symbol, limit=100):
 
+        self._acquire_weight(self._get_depth_weight(limit), 'depth')
         if self._can_make_request():
             self._logger.debug("requesting depth from binance")
             try:
@@ -128,24 +359,27 @@ class ClientManager():
                 self._handle_client_error(e)
                 return None
             else:
+                self._on_request_success()
+
                 # Update limit weights
-                if 'limit_usage' in result:
-                    self._update_weights(result['limit_usage'])
+                limit_usage = result.get('limit_usage')
+                if limit_usage is not None:
+                    self._update_weights(limit_usage)
 
                 # Return depth
-                if 'data' in result: 
-                    return result['data']
-                else:
-                    return None
+                return result.get(self._data_key)
 
     def get_klines(self, symbol, interval, start_time, end_time, limit):
 
+        self._acquire_weight(self._endpoint_weights['klines'], 'klines')
         if self._can_make_request():
-            self._logger.debug(f"requesting klines for '{symbol} {interval}' "
-                               "between "
-                               f"{datetime.fromtimestamp(start_time/1000)} "
-                               f"and {datetime.fromtimestamp(end_time/1000)}")
-            
+            # Avoid creating the datetimes when debug logging is off
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug(
+                    f"requesting klines for '{symbol} {interval}' between "
+                    f"{datetime.fromtimestamp(start_time/1000)} "
+                    f"and {datetime.fromtimestamp(end_time/1000)}")
+
             try:
                 result = self.client.klines(
                     symbol,
@@ -158,75 +392,328 @@ class ClientManager():
                 self._handle_client_error(e)
                 return None
             else:
-                # Update limit weights
-                if 'limit_usage' in result:
-                    self._update_weights(result['limit_usage'])
+                self._on_request_success()
 
-                # Return klines
-                if 'data' in result:
-                    return result['data']
+                # Update limit weights
+                limit_usage = result.get('limit_usage')
+                if limit_usage is not None:
+                    self._update_weights(limit_usage)
+
+                # Return klines as numeric column arrays
+                data = result.get(self._data_key)
+                if data:
+                    return self._parse_klines(data)
                 else:
                     return None
 
+    def _parse_klines(self, data):
+        '''
+        Convert Binance klines data into a dict of NumPy column arrays.
+
+        Binance returns each kline as a list of mixed int and string values.
+        Rather than casting each value of each kline separately, the klines
+        are converted to a single 2D array and each column is cast at once.
+        The columns are kept as separate contiguous arrays, rather than as a
+        structured array of klines, so that vectorised indicator calculations
+        and database inserts read each column sequentially.
+
+        Parameters
+        ----------
+        data: List[List]
+            Klines data in the Binance kline data format
+
+        Returns
+        -------
+        Dict[str, numpy.ndarray]
+            Dictionary of column name to int64 or float64 column array
+        '''
+        klines = np.asarray(data, dtype=object)
+
+        # Cast the transposed columns in C order, such that each row of the
+        # result is one contiguous column array
+        int_columns = klines[:, list(self._klines_int_columns.values())]
+        int_columns = int_columns.T.astype(np.int64, order='C')
+        float_columns = klines[:, list(self._klines_float_columns.values())]
+        float_columns = float_columns.T.astype(np.float64, order='C')
+
+        columns = {}
+        for i, name in enumerate(self._klines_int_columns):
+            columns[name] = int_columns[i]
+        for i, name in enumerate(self._klines_float_columns):
+            columns[name] = float_columns[i]
+
+        return columns
+
+    def get_klines_batch(self, requests, max_workers=8):
+        '''
+        Request klines for multiple symbol/interval windows concurrently.
+
+        Each request is submitted to the shared thread pool so that the
+        network latency of the blocking HTTP requests overlaps. Every request
+        waits for the shared weight window to have room for its weight
+        before calling Binance, such that the combined request rate stays
+        within the per minute weight budget, and all workers wait while a
+        client error wait time is in effect.
+
+        Parameters
+        ----------
+        requests: List[Tuple]
+            List of (symbol, interval, start_time, end_time, limit) tuples,
+            each matching the parameters of get_klines
+        max_workers: int
+            The maximum number of concurrent requests
+
+        Returns
+        -------
+        List
+            The klines data (or None) for each request, in the same order as
+            the requests
+        '''
+        return list(self.iter_klines_batch(requests, max_workers))
+
+    def iter_klines_batch(self, requests, max_workers=8):
+        '''
+        Request klines for multiple windows concurrently, yielding results.
+
+        Requests are made in the shared thread pool, keeping at most
+        max_workers requests in flight, and each result is yielded as soon
+        as it and all earlier results are available, such that callers can
+        process results in request order while later requests are still
+        being made. The number of requests in flight is reduced with the
+        weight budget when Binance is overloaded. Closing the generator
+        cancels the requests that haven't started yet.
+
+        Parameters
+        ----------
+        requests: Iterable[Tuple]
+            (symbol, interval, start_time, end_time, limit) tuples, each
+            matching the parameters of get_klines
+        max_workers: int
+            The maximum number of concurrent requests
+
+        Yields
+        ------
+        Dict
+            The klines data (or None) for each request, in the same order as
+            the requests
+        '''
+        # Scale the concurrency with the adaptive weight budget, the shared
+        # thread pool limits it to the number of pool workers
+        max_in_flight = max(1, int(min(max_workers, self._max_workers)
+                                   * self._weight_budget_1m
+                                   / self._max_weight_budget_1m))
+        requests = enumerate(requests)
+
+        # Futures of requests in flight by request index, and completed
+        # (index, klines) results waiting for earlier results
+        futures = {}
+        completed = []
+        next_index = 0
+
+        def submit_requests():
+            for index, request in requests:
+                futures[self.submit_klines(*request)] = index
+                if len(futures) >= max_in_flight:
+                    break
+
+        try:
+            submit_requests()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    heapq.heappush(completed,
+                                   (futures.pop(future), future.result()))
+                submit_requests()
+
+                # Yield the results that are next in request order
+                while completed and completed[0][0] == next_index:
+                    yield heapq.heappop(completed)[1]
+                    next_index += 1
+        finally:
+            # Cancel the requests still waiting in the thread pool when the
+            # caller stops iterating early, e.g. at the first failed request
+            for future in futures:
+                future.cancel()
+
+    def submit_klines(self, symbol, interval, start_time, end_time, limit):
+        '''
+        Request klines in the shared thread pool without blocking.
+
+        Parameters
+        ----------
+        symbol: str
+            Crypto pair symbol to request klines for
+        interval: str
+            Timeframe interval of the klines
+        start_time: int
+            Start time of the klines in ms since epoch
+        end_time: int
+            End time of the klines in ms since epoch
+        limit: int
+            Maximum number of klines to request
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the klines data (or None), as returned by get_klines
+        '''
+        return self._executor.submit(self.get_klines, symbol, interval,
+                                     start_time, end_time, limit)
+
+    def close(self):
+        '''
+        Shut down the shared thread pool once pending requests complete.
+
+        Required before forking worker processes, such that forked
+        processes don't inherit the pool threads.
+        '''
+        self._executor.shutdown(wait=True)
+
+    def _acquire_weight(self, weight, endpoint):
+
+        # Wait until the weight can be taken
+        wait_time_s = self._take_weight(weight, endpoint)
+        while wait_time_s is not None:
+            time.sleep(wait_time_s)
+            wait_time_s = self._take_weight(weight, endpoint)
+
+    def _take_weight(self, weight, endpoint):
+
+        # Add the weight to the weight window without blocking, returning
+        # None if added or otherwise the seconds to wait before trying again
+
+        # Check if any client error wait time has passed
+        if not self._can_make_request():
+            return max(0, self._restart_monotonic - time.monotonic())
+
+        with self._lock:
+            # Drop the weight of requests made more than a minute ago
+            now = time.monotonic()
+            while (self._weight_window
+                   and self._weight_window[0][0] <= now - 60):
+                self._weight_window_total -= self._weight_window.popleft()[1]
+
+            # Use the used weight reported by Binance for the current minute
+            # if higher, as it includes requests that are not in the window
+            used_weight = self._weight_window_total
+            used_weight_1m_is_higher = (
+                self._used_weight_1m_minute == int(time.time() // 60)
+                and self._x_mbx_used_weight_1m > used_weight
+            )
+            if used_weight_1m_is_higher:
+                used_weight = self._x_mbx_used_weight_1m
+
+            # Add the weight if the projected used weight is within the
+            # safety threshold of the budget, less the weight reserved for
+            # other endpoints. Weights above the limit, e.g. large depth
+            # requests after the budget decreased, are clamped to the limit
+            # such that they are made once no other weight is used rather
+            # than waiting forever
+            weight_limit = self._weight_budget_1m * (
+                self._weight_safety_ratio
+                - self._reserved_weight_ratios[endpoint])
+            if used_weight + min(weight, weight_limit) <= weight_limit:
+                self._weight_window.append((now, weight))
+                self._weight_window_total += weight
+                if used_weight_1m_is_higher:
+                    self._x_mbx_used_weight_1m += weight
+                return None
+
+            # Otherwise return the time until Binance resets the used weight
+            # for the next minute, or until the oldest request in the window
+            # is more than a minute ago
+            if used_weight_1m_is_higher or not self._weight_window:
+                return 60 - time.time() % 60
+            return self._weight_window[0][0] + 60 - now
+
+    def _get_depth_weight(self, limit):
+
+        for max_limit, weight in self._depth_weights:
+            if limit <= max_limit:
+                return weight
+        return self._depth_weights[-1][1]
+
     def _update_weights(self, limit_usage):
+
+        # Get both used weights in a single pass over the limit usage keys
+        used_weight, used_weight_1m = (
+            limit_usage.get(key) for key in self._limit_usage_keys)
+        if used_weight is None or used_weight_1m is None:
+            self._logger.warning("missing limit usage data in Binance "
+                                 "response")
+            return
+
+        # Parse both used weights before updating either of them
         try:
-            self._x_mbx_used_weight = limit_usage['x-mbx-used-weight']
-            self._x_mbx_used_weight_1m = limit_usage['x-mbx-used-weight-1m']
-        except KeyError:
-            self._logger.warning("missing limit usage data in Binance response")
-        else:
-            self._logger.debug(f"client weights:\t{self._x_mbx_used_weight}\t"
-                              f"{self._x_mbx_used_weight_1m}")
+            used_weight = int(used_weight)
+            used_weight_1m = int(used_weight_1m)
+        except ValueError:
+            self._logger.warning("invalid limit usage data in Binance "
+                                 "response")
+            return
+
+        with self._lock:
+            self._x_mbx_used_weight = used_weight
+            self._x_mbx_used_weight_1m = used_weight_1m
+
+            # Binance reports the used weight for the current minute
+            self._used_weight_1m_minute = int(time.time() // 60)
+
+        # Avoid formatting the weights when debug logging is off
+        if self._logger.isEnabledFor(logging.DEBUG):
+            self._logger.debug("client weights:\t"
+                               f"{self._x_mbx_used_weight}\t"
+                               f"{self._x_mbx_used_weight_1m}")
 
     def _can_make_request(self):
 
-        # Check if a wait time has been set due to a client error
-        if self._client_error_retry_wait_time_s > 0:
+        # Check if current time has passed any wait time set due to a client
+        # error, the restart time is 0 if no wait time has been set
+        return time.monotonic() >= self._restart_monotonic
 
-            # Check if current time has passed the wait time
-            if (datetime.now() > self._client_error_restart_time):
+    def _handle_client_error(self, e):
 
-                # Reset the wait time
-                self._client_error_retry_wait_time_s = 0
-                return True
-            else:
-                return False
-        else:
-            return True
+        with self._lock:
+            # Parse error information
+            self._client_error_http_status_code = e.status_code
+            self._client_error_code = e.error_code
+            self._client_error_message = e.error_message
+            self._client_error_header = e.header
+            self._client_error_error_data = e.error_data
+
+            self._logger.error(f"binance client error: {e.error_message}")
+
+            # Decrease the weight budget if Binance is overloaded
+            if (self._client_error_code in self._overload_error_codes
+                    or self._client_error_http_status_code
+                    in self._overload_status_codes):
+                self._decrease_weight_budget()
+
+            # Call the handler for the error code that occurred, if any
+            handler = self._client_error_handlers.get(self._client_error_code)
+            if handler:
+                handler(self)
+
+    def _decrease_weight_budget(self):
+
+        with self._lock:
+            self._weight_budget_1m = max(
+                self._min_weight_budget_1m,
+                self._weight_budget_1m * self._weight_budget_decrease_ratio
+            )
+            self._logger.warning("decreased request weight budget to "
+                                 f"{self._weight_budget_1m:.0f} per minute")
 
-    def _handle_client_error(self, e):
+    def _on_request_success(self):
 
-        # Parse error information
-        self._client_error_http_status_code = e.status_code
-        self._client_error_code = e.error_code
-        self._client_error_message = e.error_message
-        self._client_error_header = e.header
-        self._client_error_error_data = e.error_data
-
-        self._logger.error(f"binance client error: {e.error_message}")
-
-        # Check what error code occurred
-        match self._client_error_code:
-            # Disconnected
-            case -1001:
-                pass
-            # Unauthorized
-            case -1002:
-                pass
-            # Too many requests from client
-            case -1003:
-                self._handle_client_error_1003()
-            # Server busy
-            case -1004:
-                pass
-            # Timeout
-            case -1007:
-                pass
-            # Spot server overloaded
-            case -1008:
-                pass
-            case _:
-                pass
+        # Increase the weight budget back towards the Binance limit and
+        # reset the transient client error backoff
+        with self._lock:
+            self._weight_budget_1m = min(
+                self._max_weight_budget_1m,
+                self._weight_budget_1m + self._weight_budget_increase
+            )
+            self._client_error_attempt = 0
 
     def _handle_client_error_1003(self):
 
@@ -235,31 +722,59 @@ class ClientManager():
             int(self._client_error_header['retry-after'])
         )
 
-        # Get time at which next request can be made
-        self._client_error_restart_time = (
-            datetime.now()
-            + timedelta(
-                seconds=self._client_error_retry_wait_time_s
-            )
+        # Get monotonic time at which next request can be made
+        self._restart_monotonic = (
+            time.monotonic() + self._client_error_retry_wait_time_s
         )
 
-        # Get weight limit usage
-        limit_usage = {
-            'x-mbx-used-weight': (
-                self._client_error_header['x-mbx-used-weight']),
-            'x-mbx-used-weight-1m': (
-                self._client_error_header['x-mbx-used-weight-1m'])
-        }
-        self._update_weights(limit_usage)
-
-        # Check what HTTP status code occurred
-        match self._client_error_http_status_code:
-            # IP banned
-            case 418:
-                self._logger.warning("client made too many requests, IP banned "
-                                    f"until {self._client_error_restart_time}")
-            # Too many requests, warning before IP ban
-            case 429:
-                self._logger.warning("client made too many requests, waiting "
-                                    f"until {self._client_error_restart_time}"
-                                    "s to avoid IP ban")
+        # Update weight limit usage from the error header
+        self._update_weights(self._client_error_header)
+
+        # Log the warning for the HTTP status code that occurred, if any
+        warning = self._rate_limit_warnings.get(
+            self._client_error_http_status_code)
+        if warning:
+            self._logger.warning(warning, self._get_restart_time())
+
+    def _handle_client_error_backoff(self):
+
+        # Get seconds to wait before retrying, a random time of up to the
+        # backoff wait time for the number of consecutive errors
+        backoff_wait_time_s = self._backoff_base_wait_time_s * (
+            2 ** min(self._client_error_attempt, self._backoff_max_attempts))
+        self._client_error_retry_wait_time_s = (
+            random.random() * backoff_wait_time_s)
+        self._client_error_attempt += 1
+
+        # Get monotonic time at which next request can be made, without
+        # shortening a longer wait time that is already set
+        self._restart_monotonic = max(
+            self._restart_monotonic,
+            time.monotonic() + self._client_error_retry_wait_time_s
+        )
+
+        self._logger.warning("transient binance client error, waiting until "
+                             "%s before the next request",
+                             self._get_restart_time())
+
+    def _get_restart_time(self):
+
+        # Convert the monotonic restart time to a local datetime, only
+        # required when logging the restart time
+        return datetime.fromtimestamp(
+            time.time() + self._restart_monotonic - time.monotonic())
+
+    # Handlers for client error codes, other codes are logged only
+    # -1001: Disconnected
+    # -1002: Unauthorized
+    # -1003: Too many requests from client
+    # -1004: Server busy
+    # -1007: Timeout
+    # -1008: Spot server overloaded
+    _client_error_handlers = {
+        -1001: _handle_client_error_backoff,
+        -1003: _handle_client_error_1003,
+        -1004: _handle_client_error_backoff,
+        -1007: _handle_client_error_backoff,
+        -1008: _handle_client_error_backoff
+    }
@@ -1,12 +1,113 @@
 import configparser
+from dataclasses import dataclass
+from functools import lru_cache
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
-# create config parser
+
+_config_file = 'app.cfg'
+
+
+@dataclass
+class BinanceConfig:
+    '''
+    Configuration settings for the Binance client connection.
+
+    Attributes
+    ----------
+    BASE_URL: str
+        Base URL of the Binance API
+    API_KEY: str
+        Binance API key
+    SECRET_KEY: str
+        Binance API secret key
+    SYMBOLS: List[str]
+        Crypto pair symbols to update klines data for and backtest
+    INTERVALS: List[str]
+        Timeframe intervals to update klines data for
+    TIMEOUT: int
+        Binance client request timeout in seconds
+    SHOW_LIMIT_USAGE: bool
+        Whether Binance responses include the request weight limit usage
+    '''
+    BASE_URL: str
+    API_KEY: str
+    SECRET_KEY: str
+    SYMBOLS: list[str]
+    INTERVALS: list[str]
+    TIMEOUT: int = 5
+    SHOW_LIMIT_USAGE: bool = True
+
+
+@dataclass
+class DatabaseConfig:
+    '''
+    Configuration settings for the database.
+
+    Attributes
+    ----------
+    DB_CONFIG: str
+        SQLAlchemy database engine configuration URL which includes the
+        database dialect, driver and file path
+    KLINES_BATCH_SIZE: int
+        Number of klines buffered across Binance pages and inserted into the
+        database in one transaction
+    '''
+    DB_CONFIG: str
+    KLINES_BATCH_SIZE: int = 20000
+
+
+@dataclass
+class AppConfig:
+    binance: BinanceConfig
+    database: DatabaseConfig
+
+
+# create config parser, cached so repeated calls don't re-parse app.cfg
+@lru_cache(maxsize=1)
 def get_config():
+    '''
+    Load the app.cfg configuration as typed config settings.
+
+    Values are parsed and cast once when loading, such that invalid config
+    values raise an error at startup. The optional TIMEOUT and
+    SHOW_LIMIT_USAGE binance values and the KLINES_BATCH_SIZE database value
+    use defaults when not set.
+
+    Returns
+    -------
+    AppConfig
+        The config settings, or None if app.cfg could not be parsed
+
+    Raises
+    ------
+    KeyError
+        If app.cfg, one of its sections or a required value is missing
+    '''
     try:
-        config = configparser.ConfigParser()
-        config.read('app.cfg')
+        parser = configparser.ConfigParser()
+        parser.read(_config_file)
     except configparser.Error:
         return None
-    else:
-        return config
+
+    binance = parser['binance']
+    return AppConfig(
+        binance=BinanceConfig(
+            BASE_URL=binance['BASE_URL'],
+            API_KEY=binance['API_KEY'],
+            SECRET_KEY=binance['SECRET_KEY'],
+            SYMBOLS=_json_loads(binance['SYMBOLS']),
+            INTERVALS=_json_loads(binance['INTERVALS']),
+            TIMEOUT=binance.getint('TIMEOUT', fallback=5),
+            SHOW_LIMIT_USAGE=binance.getboolean('SHOW_LIMIT_USAGE',
+                                                fallback=True)
+        ),
+        database=DatabaseConfig(
+            DB_CONFIG=parser['database']['DB_CONFIG'],
+            KLINES_BATCH_SIZE=parser['database'].getint('KLINES_BATCH_SIZE',
+                                                        fallback=20000)
+        )
+    )
@@ -1,14 +1,26 @@
-import json
+import io
+import csv
+import time
+import logging
+import threading
+import numpy as np
 import pandas as pd
 from math import floor
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, select, inspect
+from dateutil.tz import tzlocal
+from sqlalchemy import (create_engine, select, insert, inspect, func, event,
+                        make_url)
 from models.base import Base
 from models.klines import Kline
 from models.backtests import Backtest
 from binance_algorithmic_trading.logger import Logger
 
+# Local timezone, following the daylight saving rules of the system as
+# datetime.fromtimestamp does
+_local_time_zone = tzlocal()
+
 
 class DatabaseManager():
     """
@@ -32,17 +44,21 @@ class DatabaseManager():
         Initialise the database engine based on the database models
     update_klines(symbols, intervals, client_manager)
         Update the database with klines data from the Binance client
+    save_backtests(results)
+        Save the results of multiple backtests in a single insert
+    dispose_engine_connections()
+        Discard pooled connections inherited from a parent process
     """
 
-    _valid_symbols = [
+    _valid_symbols = frozenset({
         'BTCUSDT',
         'SHIBUSDT',
         'ETHUSDT',
         'ADAUSDT'
-    ]
+    })
 
     # See https://binance-docs.github.io/apidocs/delivery/en/
-    _valid_intervals = [
+    _valid_intervals = frozenset({
         '1m',
         '3m',
         '5m',
@@ -58,14 +74,42 @@ class DatabaseManager():
         '3d',
         '1w',
         '1M'
-    ]
-
-    _seconds_per_interval = {
-        'm': 60,
-        'h': 60*60,
-        'd': 24*60*60,
-        'w': 7*24*60*60,
-        'M': 28*24*60*60
+    })
+
+    # Number of klines query results kept in memory, such that repeated
+    # backtests over the same klines, e.g. parameter sweeps, don't query the
+    # database again
+    _max_cached_klines_dfs = 16
+
+    # Pragmas set on each SQLite connection. Write-ahead logging lets
+    # readers, e.g. backtest worker processes, read while klines are
+    # written, and only syncs to disk at checkpoints rather than on every
+    # commit, while staying consistent after a crash
+    _sqlite_pragmas = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA temp_store=MEMORY',
+        'PRAGMA mmap_size=268435456'
+    )
+
+    # Milliseconds per kline of each valid interval, note a month is taken
+    # as 28 days such that monthly klines are never skipped
+    _ms_per_interval = {
+        '1m': 60*1000,
+        '3m': 3*60*1000,
+        '5m': 5*60*1000,
+        '15m': 15*60*1000,
+        '30m': 30*60*1000,
+        '1h': 60*60*1000,
+        '2h': 2*60*60*1000,
+        '4h': 4*60*60*1000,
+        '6h': 6*60*60*1000,
+        '8h': 8*60*60*1000,
+        '12h': 12*60*60*1000,
+        '1d': 24*60*60*1000,
+        '3d': 3*24*60*60*1000,
+        '1w': 7*24*60*60*1000,
+        '1M': 28*24*60*60*1000
     }
 
     def __init__(self, log_level, config):
@@ -76,16 +120,27 @@ class DatabaseManager():
         ---------
         log_level: int
             The logging level as specified in the logging module
-        config: Dict
-            Dictionary containing the SQLAlchemy database engine configuration
-            URL which includes the database dialect, driver and file path
+        config: DatabaseConfig
+            The database settings containing the SQLAlchemy database engine
+            configuration URL which includes the database dialect, driver and
+            file path
         """
         self._config = config
+        self._klines_df_cache = OrderedDict()
+
+        # Open time of the earliest klines entry of each symbol and interval
+        # after retrieving all earlier klines data, such that later updates
+        # only check for older klines data if the earliest entry changed.
+        # Not persisted, as failed requests also end the retrieval
+        self._earliest_open_times = {}
+
+        # Lock serialising klines writes from concurrent klines updates
+        self._klines_write_lock = threading.Lock()
         self._logger = Logger(logger_name=__file__,
                               log_level=log_level).get_logger()
 
         try:
-            self._engine = create_engine(self._config['DB_CONFIG'])
+            self._engine = self._create_engine(self._config.DB_CONFIG)
         except Exception as e:
             self._logger.critical("failed to initialise SQLAlchemy database "
                                   f"engine with error: {e}")
@@ -94,33 +149,105 @@ class DatabaseManager():
 
         try:
             Base.metadata.create_all(self._engine)
+
+            # Create indexes added after the tables were created
+            for index in Kline.__table__.indexes:
+                index.create(self._engine, checkfirst=True)
         except Exception as e:
             self._logger.debug("failed to create database tables with error: "
-                               f"{e}")
+                               "%s", e)
         else:
-            self._logger.debug("intialised database tables: "
-                               f"{inspect(self._engine).get_table_names()}")
+            # Avoid inspecting the database tables when debug logging is off
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug(
+                    "intialised database tables: %s",
+                    inspect(self._engine).get_table_names())
+
+    def _create_engine(self, db_config):
+
+        # Set dialect specific engine options, SQLite connections are local
+        # so don't need checking before use
+        url = make_url(db_config)
+        backend = url.get_backend_name()
+        engine_kwargs = {}
+        if backend != 'sqlite':
+            engine_kwargs['pool_pre_ping'] = True
+        if backend == 'mssql' and url.get_driver_name() == 'pyodbc':
+            engine_kwargs['fast_executemany'] = True
+
+        engine = create_engine(url, **engine_kwargs)
+        if backend == 'sqlite':
+            event.listen(engine, 'connect', self._set_sqlite_pragmas)
+
+        return engine
+
+    def _set_sqlite_pragmas(self, dbapi_connection, connection_record):
+
+        # Configure each new SQLite connection for fast bulk inserts
+        cursor = dbapi_connection.cursor()
+        for pragma in self._sqlite_pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+    def dispose_engine_connections(self):
+        '''
+        Discard pooled connections inherited from a parent process.
+
+        Required in forked worker processes such that database connections
+        opened by the parent process are not shared between processes.
+        '''
+        self._engine.dispose(close=False)
 
     def save_backtest(self, results):
         '''
         Save results from a backtest into the backtests database table.
         '''
-        self._logger.debug("saving backtest results for "
-                           f"'{results['strategy_name']}' Strategy on"
-                           f"'{results['symbol']}'")
+        self._logger.debug("saving backtest results for '%s' Strategy on"
+                           "'%s'", results['strategy_name'], results['symbol'])
+
+        self.save_backtests([results])
+
+    def save_backtests(self, results):
+        '''
+        Save results from multiple backtests into the backtests database table.
+
+        The results are inserted with a single executemany INSERT in one
+        transaction, such that parameter sweeps can save all their backtests
+        in one round trip rather than one per backtest.
+
+        Parameters
+        ----------
+        results: List[dict]
+            The stats returned by each backtest, keyed by backtests table
+            column names
+
+        Returns
+        -------
+        None
+        '''
+        if not results:
+            return
 
-        with Session(self._engine) as session:
-            new_backtest_entry = Backtest(**results)
-            session.add(new_backtest_entry)
-            session.commit()
+        with self._engine.begin() as connection:
+            connection.execute(insert(Backtest), list(results))
 
     def get_klines_df(self, symbol, interval, start_time, end_time):
         '''
         Return a pandas df with klines data for given symbol between two times.
+
+        Results are cached until klines are next saved to the database, a
+        copy of the cached df is returned so callers can modify it.
         '''
 
-        self._logger.debug(f"retrieving klines for '{symbol} {interval}' "
-                           f"between {start_time} and {end_time}")
+        # Return a copy of the cached klines if already queried
+        key = (symbol, interval, start_time, end_time)
+        klines_df = self._klines_df_cache.get(key)
+        if klines_df is not None:
+            self._klines_df_cache.move_to_end(key)
+            return klines_df.copy()
+
+        self._logger.debug("retrieving klines for '%s %s' between %s and %s",
+                           symbol, interval, start_time, end_time)
 
         query = (
             select(Kline)
@@ -133,9 +260,15 @@ class DatabaseManager():
 
         klines_df = pd.read_sql(query, self._engine)
 
-        return klines_df
+        # Cache the klines, evicting the least recently used klines
+        self._klines_df_cache[key] = klines_df
+        if len(self._klines_df_cache) > self._max_cached_klines_dfs:
+            self._klines_df_cache.popitem(last=False)
+
+        return klines_df.copy()
 
-    def update_klines(self, symbols, intervals, client_manager):
+    def update_klines(self, symbols, intervals, client_manager,
+                      max_workers=4):
         '''
         Update the database with klines data from Binance.
 
@@ -147,6 +280,11 @@ class DatabaseManager():
         and interval pair, 3) fetches any earlier or later data that is missing
         and, 4) updates the database with the data.
 
+        Symbol and interval pairs are updated concurrently in a thread pool,
+        overlapping the Binance requests of each pair while the client
+        manager keeps the combined requests within the rate limits, and
+        database writes are made one at a time.
+
         Note that no data is returned because the database is updated during
         the function execution.
 
@@ -158,22 +296,34 @@ class DatabaseManager():
             List of timeframe intervals for which klines data is to be updated
         client_manager: ClientManager
             A custom class for interfacing with the Binance Spot API (client)
+        max_workers: int
+            The maximum number of symbol and interval pairs updated
+            concurrently
 
         Returns
         -------
         None
         '''
-        symbols = json.loads(symbols)
-        intervals = json.loads(intervals)
-
         self._logger.info("updating database with new klines, please wait...")
-        # For each symbol and interval, get missing klines data
-        for symbol in symbols:
+        # Make the symbols all uppercase as requiered by binance
+        # Required because the configparser file forces all strings to
+        # lowercase. Duplicates are dropped keeping the config order
+        symbols = dict.fromkeys(symbol.upper() for symbol in symbols)
+        intervals = dict.fromkeys(intervals)
+
+        # Check intervals are valid, once rather than for every symbol
+        valid_intervals = []
+        for interval in intervals:
+            if interval not in self._valid_intervals:
+                self._logger.warning("skipping invalid interval "
+                                     f"'{interval}' listed in app.cfg "
+                                     "file")
+                continue
+            valid_intervals.append(interval)
 
-            # Make the symbol all uppercase as requiered by binance
-            # Required because the configparser file forces all strings to
-            # lowercase
-            symbol = symbol.upper()
+        # Get the valid symbol and interval pairs
+        pairs = []
+        for symbol in symbols:
 
             # Check symbol is valid
             if symbol not in self._valid_symbols:
@@ -181,19 +331,18 @@ class DatabaseManager():
                                      "listed in app.cfg file")
                 continue
 
-            for interval in intervals:
-                # Check interval is valid
-                if interval not in self._valid_intervals:
-                    self._logger.warning("skipping invalid interval "
-                                         f"'{interval}' listed in app.cfg "
-                                         "file")
-                    continue
-
-                # Get missing klines data for given symbol and interval
-                self._logger.debug("checking for new data for "
-                                   f"'{symbol} {interval}'")
-                self._get_missing_klines(symbol, interval, client_manager)
-        
+            pairs.extend((symbol, interval) for interval in valid_intervals)
+
+        # For each symbol and interval, get missing klines data
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._get_missing_klines, symbol, interval,
+                                client_manager)
+                for symbol, interval in pairs
+            ]
+            for future in futures:
+                future.result()
+
         self._logger.info("klines database is up to date")
 
     def _get_missing_klines(self, symbol, interval, client_manager):
@@ -219,29 +368,37 @@ class DatabaseManager():
         '''
 
         # Check database for earliest klines entry for given symbol/interval
-        self._logger.debug("checking latest klines data entry for "
-                           f"'{symbol} {interval}'")
-        with Session(self._engine) as session:
-            # Get earliest (first) klines entry in the database
-            first_klines_entry = session.scalars(
-                select(Kline)
-                .filter_by(symbol=symbol)
-                .filter_by(interval=interval)
-                .order_by(Kline.open_time)
-            ).first()
+        self._logger.debug("checking for new data for '%s %s'", symbol,
+                           interval)
+        first_open_time, last_open_time = self._get_klines_open_time_range(
+            symbol, interval)
 
         # No data exists
-        if first_klines_entry is None:
+        if first_open_time is None:
             # Get all klines data before the current time
-            self._logger.debug("no klines data exists for "
-                               f"'{symbol} {interval}'")
+            self._logger.debug("no klines data exists for '%s %s'", symbol,
+                               interval)
             self._get_klines(
                 symbol,
                 interval,
                 client_manager,
-                end_time_ms_since_utc=datetime.now().timestamp()*1000,
+                end_time_ms_since_utc=time.time_ns() // 1000000,
                 reverse=True
             )
+
+            # Get the earliest and latest entries of the klines data that
+            # was retrieved
+            first_open_time, last_open_time = (
+                self._get_klines_open_time_range(symbol, interval))
+            if first_open_time is None:
+                return
+            self._earliest_open_times[(symbol, interval)] = first_open_time
+        # All earlier klines data was retrieved by a previous update
+        elif (self._earliest_open_times.get((symbol, interval))
+                == first_open_time):
+            self._logger.debug("older klines data than what is in the "
+                               "database was already retrieved for '%s %s'",
+                               symbol, interval)
         # klines data does exist
         else:
             # Get any klines data before the earliest entry
@@ -249,13 +406,13 @@ class DatabaseManager():
             # data is being retrieved (in reverse) for a new symbol/interval,
             # then there may still be older klines data that was not retrieved
             self._logger.debug("checking for older klines data than what is "
-                               f"in the database for '{symbol} {interval}'")
+                               "in the database for '%s %s'", symbol,
+                               interval)
 
             # Get the open time of the klines entry one-prior to the earliest
             # entry that exists in the database
             open_time_of_next_earlier_entry = self._get_next_klines_start_time(
-                last_time_ms_since_utc=(first_klines_entry
-                                        .open_time.timestamp()*1000),
+                last_time_ms_since_utc=first_open_time.timestamp()*1000,
                 interval=interval,
                 klines_limit=1,
                 reverse=True
@@ -270,35 +427,80 @@ class DatabaseManager():
                 reverse=True
             )
 
-        # Get latest (last) klines entry in the database
-        last_klines_entry = session.scalars(
-            select(Kline)
-            .filter_by(symbol=symbol)
-            .filter_by(interval=interval)
-            .order_by(Kline.open_time.desc())
-        ).first()
+            # Get the earliest entry, including any earlier klines data
+            first_open_time, _ = self._get_klines_open_time_range(
+                symbol, interval)
+            self._earliest_open_times[(symbol, interval)] = first_open_time
 
         # Get remaining klines data up to the current time
         self._get_klines(
             symbol,
             interval,
             client_manager,
-            end_time_ms_since_utc=last_klines_entry.open_time.timestamp()*1000,
+            end_time_ms_since_utc=last_open_time.timestamp()*1000,
             reverse=False
         )
 
+    def _to_local_datetimes(self, times_ms_since_utc):
+
+        # Convert an array of ms since epoch times to naive local datetimes
+        # at once, matching datetime.fromtimestamp for each time
+        return (
+            pd.to_datetime(times_ms_since_utc, unit='ms', utc=True)
+            .tz_convert(_local_time_zone)
+            .tz_localize(None)
+            .to_pydatetime()
+            .tolist()
+        )
+
+    def _copy_klines(self, names, rows):
+
+        # Copy the rows into the klines table, quoting the column names as
+        # interval is a reserved word in Postgres
+        columns = ', '.join(f'"{name}"' for name in names)
+        with self._engine.begin() as connection:
+            cursor = connection.connection.cursor()
+
+            # psycopg 3 streams the rows to the server as they are adapted,
+            # without first writing them all out as CSV
+            if self._engine.dialect.driver == 'psycopg':
+                with cursor.copy(f"COPY {Kline.__tablename__} ({columns}) "
+                                 "FROM STDIN") as copy:
+                    for row in rows:
+                        copy.write_row(row)
+                return
+
+            # Write the rows as CSV for psycopg2
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(rows)
+            buffer.seek(0)
+
+            cursor.copy_expert(
+                f"COPY {Kline.__tablename__} ({columns}) FROM STDIN WITH CSV",
+                buffer)
+
+    def _get_klines_open_time_range(self, symbol, interval):
+
+        # Get the open time of the earliest (first) and latest (last) klines
+        # entries in the database in one query, or None if there are none.
+        # Uses a pooled connection directly as no ORM objects are loaded
+        with self._engine.connect() as connection:
+            return tuple(connection.execute(
+                select(func.min(Kline.open_time), func.max(Kline.open_time))
+                .filter_by(symbol=symbol)
+                .filter_by(interval=interval)
+            ).one())
+
 
     def _get_next_klines_start_time(self, last_time_ms_since_utc, interval, klines_limit, reverse=False):
     
-        # Get the ms multiplier for a given interval
-        interval_in_ms = (int(interval[:-1]) * self._seconds_per_interval[interval[-1]]) * 1000
+        # Get the ms between the klines for a given interval
+        delta_ms = self._ms_per_interval[interval] * klines_limit
 
         if not reverse:
-            next_start_time_ms_since_utc = last_time_ms_since_utc + (interval_in_ms * klines_limit)
+            return last_time_ms_since_utc + delta_ms
         else:
-            next_start_time_ms_since_utc = last_time_ms_since_utc - (interval_in_ms * klines_limit)
-
-        return next_start_time_ms_since_utc
+            return last_time_ms_since_utc - delta_ms
 
 
     def _get_klines(self, symbol, interval, client_manager, end_time_ms_since_utc, reverse=False):
@@ -312,45 +514,31 @@ class DatabaseManager():
         # Get all klines from start_time_ms_since_utc until current time        
         klines_max_limit = 1500
 
-        # if reverse, preset the start time to the end time that was passed in
-        if reverse:
-            start_time_ms_since_utc = end_time_ms_since_utc
+        # If not reverse, all windows between the end time that was passed in
+        # and the current time are known, so request them concurrently
+        if not reverse:
+            self._get_klines_forward(symbol, interval, client_manager,
+                                     end_time_ms_since_utc, klines_max_limit)
+            return
 
-        while True:
+        # Preset the start time to the end time that was passed in
+        start_time_ms_since_utc = end_time_ms_since_utc
 
-            if not reverse:
-                # Set start time to the time of the next klines entry
-                start_time_ms_since_utc = self._get_next_klines_start_time(
-                    last_time_ms_since_utc=end_time_ms_since_utc,
-                    interval=interval,
-                    klines_limit=1
-                ) 
-                # Set end time to the time of the klines 1500 entries later
-                end_time_ms_since_utc = self._get_next_klines_start_time(
-                    last_time_ms_since_utc=start_time_ms_since_utc,
-                    interval=interval,
-                    klines_limit=klines_max_limit
-                )
-
-                # Break if new start time is past the current time
-                current_time_ms_since_utc = floor(datetime.now().timestamp() * 1000)
-                if start_time_ms_since_utc > current_time_ms_since_utc:
-                    break
+        # Buffer klines pages to bulk insert them into the database
+        klines_buffer = []
 
-                # Limit end time to max current time        
-                if end_time_ms_since_utc > current_time_ms_since_utc:
-                    end_time_ms_since_utc = current_time_ms_since_utc
-            else:
-                # Set the end time to the previous start time 
-                end_time_ms_since_utc = start_time_ms_since_utc
+        while True:
+
+            # Set the end time to the previous start time 
+            end_time_ms_since_utc = start_time_ms_since_utc
 
-                # Set the start time to the time of the klines 1500 entries earlier
-                start_time_ms_since_utc = self._get_next_klines_start_time(
-                    last_time_ms_since_utc=start_time_ms_since_utc,
-                    interval=interval,
-                    klines_limit=klines_max_limit,
-                    reverse=True
-                )
+            # Set the start time to the time of the klines 1500 entries earlier
+            start_time_ms_since_utc = self._get_next_klines_start_time(
+                last_time_ms_since_utc=start_time_ms_since_utc,
+                interval=interval,
+                klines_limit=klines_max_limit,
+                reverse=True
+            )
 
             # take floor of start and end times to ensure when converted from ms to s there is no decimal values
             start_time_ms_since_utc = floor(start_time_ms_since_utc)
@@ -366,7 +554,9 @@ class DatabaseManager():
             if end_time_ms_since_utc < 0:
                 break
 
-            self._logger.debug(f"getting klines for '{symbol} {interval}' between {datetime.fromtimestamp(start_time_ms_since_utc/1000)} and {datetime.fromtimestamp(end_time_ms_since_utc/1000)}")
+            # Avoid creating the datetimes when debug logging is off
+            if self._logger.isEnabledFor(logging.DEBUG):
+                self._logger.debug(f"getting klines for '{symbol} {interval}' between {datetime.fromtimestamp(start_time_ms_since_utc/1000)} and {datetime.fromtimestamp(end_time_ms_since_utc/1000)}")
 
             # Get the klines between the start and end time from binance
             klines = client_manager.get_klines(
@@ -379,30 +569,132 @@ class DatabaseManager():
 
             # Check if klines exist (they don't if binance data doesn't exist for the given start and end times)
             if klines:
-                self._save_klines(symbol, interval, klines)
+                klines_buffer.append(klines)
+                klines_buffer = self._save_klines_buffer(
+                    symbol, interval, klines_buffer)
             else:
                 # Break as there are no more klines to read, finished getting all available historical data
                 break
 
+        # Save the remaining buffered klines
+        self._save_klines_buffer(symbol, interval, klines_buffer, flush=True)
+
+    def _get_klines_forward(self, symbol, interval, client_manager,
+                            end_time_ms_since_utc, klines_max_limit):
+
+        # Build the list of request windows from the last entry up to the
+        # current time, read once as integer milliseconds as building the
+        # windows makes no requests so it doesn't go stale
+        requests = []
+        current_time_ms_since_utc = time.time_ns() // 1000000
+        while True:
+            # Set start time to the time of the next klines entry
+            start_time_ms_since_utc = self._get_next_klines_start_time(
+                last_time_ms_since_utc=end_time_ms_since_utc,
+                interval=interval,
+                klines_limit=1
+            )
+            # Set end time to the time of the klines 1500 entries later
+            end_time_ms_since_utc = self._get_next_klines_start_time(
+                last_time_ms_since_utc=start_time_ms_since_utc,
+                interval=interval,
+                klines_limit=klines_max_limit
+            )
+
+            # Break if new start time is past the current time
+            if start_time_ms_since_utc > current_time_ms_since_utc:
+                break
+
+            # Limit end time to max current time
+            if end_time_ms_since_utc > current_time_ms_since_utc:
+                end_time_ms_since_utc = current_time_ms_since_utc
+
+            # take floor of start and end times to ensure when converted from
+            # ms to s there is no decimal values
+            start_time_ms_since_utc = floor(start_time_ms_since_utc)
+            end_time_ms_since_utc = floor(end_time_ms_since_utc)
+
+            requests.append((symbol, interval, start_time_ms_since_utc,
+                             end_time_ms_since_utc, klines_max_limit))
+
+        if not requests:
+            return
+
+        self._logger.debug("getting %d windows of klines for '%s %s'",
+                           len(requests), symbol, interval)
+
+        # Get the klines for all windows from binance concurrently, results
+        # are yielded in window order so they are saved in time order while
+        # later windows are still being requested
+        klines_buffer = []
+        klines_pages = client_manager.iter_klines_batch(requests)
+        try:
+            for klines in klines_pages:
+                # Stop at the first window without klines, including failed
+                # requests, such that no later windows are saved after a gap
+                # and the next update requests the missing klines again
+                if not klines:
+                    break
+                klines_buffer.append(klines)
+                klines_buffer = self._save_klines_buffer(
+                    symbol, interval, klines_buffer)
+        finally:
+            # Cancel the requests of any later windows
+            klines_pages.close()
+
+        # Save the remaining buffered klines
+        self._save_klines_buffer(symbol, interval, klines_buffer, flush=True)
+
+    def _save_klines_buffer(self, symbol, interval, klines_buffer,
+                            flush=False):
+
+        # Save the buffered klines once enough rows are buffered, or when
+        # flushing, and return the new (emptied) buffer
+        num_rows = sum(len(klines['open_time']) for klines in klines_buffer)
+        if num_rows == 0:
+            return klines_buffer
+        if num_rows < self._config.KLINES_BATCH_SIZE and not flush:
+            return klines_buffer
+
+        # Join the column arrays of all buffered klines pages
+        klines = {
+            name: np.concatenate([page[name] for page in klines_buffer])
+            for name in klines_buffer[0]
+        }
+        self._save_klines(symbol, interval, klines)
+        return []
+
     def _save_klines(self, symbol, interval, klines):
-        # Add klines to the database
-        self._logger.debug(f"updating klines database with latest data for '{symbol} {interval}'")
-        with Session(self._engine) as session:
-            for kline in klines:
-                new_kline_entry = Kline(
-                    symbol=symbol,
-                    interval=interval,
-                    open_time=datetime.fromtimestamp(kline[0]/1000),
-                    open=kline[1],
-                    high=kline[2],
-                    low=kline[3],
-                    close=kline[4],
-                    volume=kline[5],
-                    close_time=datetime.fromtimestamp(kline[6]/1000),
-                    quote_asset_volume=kline[7],
-                    num_trades=kline[8],
-                    taker_buy_base_asset_volume=kline[9],
-                    taker_buy_quote_asset_volume=kline[10]
-                )
-                session.add(new_kline_entry)
-            session.commit()
+        # Add klines to the database with a single executemany INSERT,
+        # klines is a dict of column arrays, so build the rows from the
+        # columns rather than creating a Kline ORM object for each kline
+        self._logger.debug("updating klines database with %d klines for "
+                           "'%s %s'", len(klines['open_time']), symbol,
+                           interval)
+        columns = {name: values.tolist() for name, values in klines.items()}
+        columns['open_time'] = self._to_local_datetimes(klines['open_time'])
+        columns['close_time'] = self._to_local_datetimes(klines['close_time'])
+
+        names = ['symbol', 'interval', *columns]
+
+        # Write the klines one update at a time, as concurrent writes would
+        # wait on each other's locks, e.g. the SQLite database lock
+        with self._klines_write_lock:
+            # Stream the klines to Postgres with COPY, bypassing the per-row
+            # statement parameters of executemany
+            if self._engine.dialect.driver in ('psycopg2', 'psycopg'):
+                self._copy_klines(names, (
+                    (symbol, interval, *values)
+                    for values in zip(*columns.values())
+                ))
+            else:
+                rows = [
+                    dict(zip(names, (symbol, interval, *values)))
+                    for values in zip(*columns.values())
+                ]
+
+                with self._engine.begin() as connection:
+                    connection.execute(insert(Kline), rows)
+
+            # Cached klines query results may no longer match the database
+            self._klines_df_cache.clear()
@@ -1,24 +1,17 @@
 import logging
 
 
-class Logger():
-    """
-    Docstring
-    """
-    logger = None
-    logger_name = None
-    log_level = None
+# Console and file handlers shared by all loggers, created on first use
+_handlers = None
 
-    def __init__(self, logger_name, log_level):
 
-        # create logger
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(log_level)
-        logger.propagate = True
+def _get_handlers():
+    global _handlers
 
+    if _handlers is None:
         # create formatter
         formatter = logging.Formatter('%(asctime)s %(filename)20s %(funcName)20s %(levelname)8s: %(message)s')
-        
+
         # create console handler
         ch = logging.StreamHandler()
         ch.setLevel(logging.DEBUG)
@@ -29,9 +22,32 @@ class Logger():
         fh.setLevel(logging.DEBUG)
         fh.setFormatter(formatter)
 
-        # add console and file handlers to the logger
-        logger.addHandler(ch)
-        logger.addHandler(fh)
+        _handlers = (ch, fh)
+
+    return _handlers
+
+
+class Logger():
+    """
+    Docstring
+    """
+    logger = None
+    logger_name = None
+    log_level = None
+
+    def __init__(self, logger_name, log_level):
+
+        # create logger
+        logger = logging.getLogger(logger_name)
+        logger.setLevel(log_level)
+        logger.propagate = True
+
+        # add console and file handlers to the logger, only once as loggers
+        # are cached by name and would otherwise write each message once
+        # per instance created
+        if not logger.handlers:
+            for handler in _get_handlers():
+                logger.addHandler(handler)
 
         self.logger = logger
         self.logger_name = logger_name
@@ -1,34 +1,34 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
-from sqlalchemy import engine
+from sqlalchemy import MetaData, Table, select
 
 def klines_plotter(engine, table_name, num_klines):
 
-    # Read klines database into pandas df
+    # Read only the latest klines from the database into pandas df, in
+    # time order
     with engine.connect() as conn:
-        df = pd.read_sql(table_name, conn)
-    
-    # Take last 20 minutes of data
-    df = df.tail(num_klines)
+        table = Table(table_name, MetaData(), autoload_with=conn)
+        query = (
+            select(table)
+            .order_by(table.c.open_time.desc())
+            .limit(num_klines)
+        )
+        df = pd.read_sql(query, conn).iloc[::-1].reset_index(drop=True)
 
     # Create plot
     plt.figure()
 
-    # Set bar widths for candle body and wick
+    # Set bar width for candle body and line width for candle wick
     body_width = 0.4
-    wick_width = 0.05
-    
-    # Get separate dataframes for candles that went up and down
-    up = df[df.close>=df.open]
-    down = df[df.close<df.open]
-
-    # Plot up prices as green
-    plt.bar(up.index,up.close-up.open,body_width,bottom=up.open,color='green')
-    plt.bar(up.index,up.high-up.low,wick_width,bottom=up.low,color='green')
-
-    # Plot down prices as red
-    plt.bar(down.index,down.close-down.open,body_width,bottom=down.open,color='red')
-    plt.bar(down.index,down.high-down.low,wick_width,bottom=down.low,color='red')
+    wick_width = 0.5
+
+    # Colour candles that went up green and candles that went down red
+    colors = np.where(df.close>=df.open, 'green', 'red')
+
+    # Plot all wicks and then all bodies, each in a single call
+    plt.vlines(df.index,df.low,df.high,colors=colors,linewidth=wick_width)
+    plt.bar(df.index,df.close-df.open,body_width,bottom=df.open,color=colors)
 
     # Rotate x-axis tick labels
     plt.xticks(rotation=45, ha='right')
@@ -0,0 +1,136 @@
+import numpy as np
+from binance_algorithmic_trading.utils._njit import njit
+
+
+@njit(cache=True)
+def rolling_mean(values, window):
+    '''
+    Calculate the mean of the previous window values for each value.
+
+    Matches pandas rolling(window=window, closed='left').mean(), such that
+    the value at each index is excluded from its own mean and the first
+    window values are NaN.
+    '''
+    n = len(values)
+    means = np.full(n, np.nan)
+    window_sum = 0.0
+    for i in range(n):
+        if i >= window:
+            means[i] = window_sum / window
+            window_sum -= values[i - window]
+        window_sum += values[i]
+    return means
+
+
+@njit(cache=True)
+def emax_loop(close, EMA_fast, EMA_slow, capital, highest_capital,
+              commission_rate):
+    '''
+    Simulate EMAX strategy trades over arrays of entry interval candles.
+
+    A trade is entered at the close of the candle on which the fast EMA
+    crosses above the slow EMA, and exited at the close of the candle on
+    which the fast EMA crosses below the slow EMA.
+
+    Parameters
+    ----------
+    close: numpy.ndarray
+        Candle close prices
+    EMA_fast: numpy.ndarray
+        Fast EMA value for each candle
+    EMA_slow: numpy.ndarray
+        Slow EMA value for each candle
+    capital: float
+        Account capital at the start of the simulation
+    highest_capital: float
+        Highest account capital used for calculating drawdown
+    commission_rate: float
+        Commission rate paid on the entry and exit value of each trade
+
+    Returns
+    -------
+    Tuple[numpy.ndarray]
+        Entry index, exit index, quantity, gross profit, net profit,
+        commission, remaining capital and drawdown of each trade
+    '''
+    n = len(close)
+
+    # A trade requires an entry and exit crossover on different candles
+    max_trades = n // 2 + 1
+    entry_index = np.empty(max_trades, dtype=np.int64)
+    exit_index = np.empty(max_trades, dtype=np.int64)
+    quantity = np.empty(max_trades)
+    gross_profit = np.empty(max_trades)
+    net_profit = np.empty(max_trades)
+    commission = np.empty(max_trades)
+    remaining_capital = np.empty(max_trades)
+    drawdown = np.empty(max_trades)
+
+    num_trades = 0
+    in_trade = False
+    first_crossover = True
+    EMA_fast_was_above_slow = False
+    trade_entry_index = 0
+    entry_price = 0.0
+    trade_quantity = 0.0
+
+    for i in range(n):
+
+        # Check for a crossover of the fast and slow EMA, noting that NaN
+        # comparisons are False as for the pandas query this replaces
+        EMA_fast_above_slow = EMA_fast[i] > EMA_slow[i]
+        EMA_crossover = i > 0 and (
+            EMA_fast_above_slow != EMA_fast_was_above_slow)
+        EMA_fast_was_above_slow = EMA_fast_above_slow
+
+        if not EMA_crossover:
+            continue
+
+        # Cancel the first EMA crossover signal if it occurred when the
+        # slow EMA value was first calculated, to avoid the false trigger
+        # from the change of the default False flag
+        if first_crossover:
+            first_crossover = False
+            if np.isnan(EMA_slow[i - 1]):
+                continue
+
+        # Check for BUY
+        if EMA_fast_above_slow and not in_trade:
+
+            in_trade = True
+            trade_entry_index = i
+            entry_price = close[i]
+            trade_quantity = capital / entry_price
+
+        # Check for SELL
+        elif not EMA_fast_above_slow and in_trade:
+
+            in_trade = False
+            exit_price = close[i]
+            trade_commission = (
+                trade_quantity * (entry_price + exit_price) * commission_rate)
+            trade_gross_profit = trade_quantity * (exit_price - entry_price)
+            trade_net_profit = trade_gross_profit - trade_commission
+
+            capital += trade_net_profit
+            if capital > highest_capital:
+                trade_drawdown = 0.0
+                highest_capital = capital
+            else:
+                trade_drawdown = round(
+                    (1 - (capital / highest_capital)) * 100, 2)
+
+            entry_index[num_trades] = trade_entry_index
+            exit_index[num_trades] = i
+            quantity[num_trades] = trade_quantity
+            gross_profit[num_trades] = trade_gross_profit
+            net_profit[num_trades] = trade_net_profit
+            commission[num_trades] = trade_commission
+            remaining_capital[num_trades] = capital
+            drawdown[num_trades] = trade_drawdown
+            num_trades += 1
+
+    return (entry_index[:num_trades], exit_index[:num_trades],
+            quantity[:num_trades], gross_profit[:num_trades],
+            net_profit[:num_trades], commission[:num_trades],
+            remaining_capital[:num_trades], drawdown[:num_trades])
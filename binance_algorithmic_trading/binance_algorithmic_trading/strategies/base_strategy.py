@@ -1,7 +1,77 @@
 import json
-from pandas import DataFrame
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from pandas import DataFrame, concat, factorize
 from abc import ABC, abstractmethod
 from binance_algorithmic_trading.logger import Logger
+from binance_algorithmic_trading.utils._njit import njit
+
+
+# Strategy being backtested by forked worker processes, set before the
+# process pool is created such that workers inherit it without pickling
+_backtest_strategy = None
+
+
+def _backtest_symbol(symbol):
+    '''
+    Backtest a single symbol using the strategy inherited from the parent.
+
+    Each symbol is backtested independently using the starting capital and
+    an empty trade log, and the trade log and ending capital are returned to
+    the parent process.
+    '''
+    strategy = _backtest_strategy
+
+    # Database connections must not be shared with the parent process
+    strategy._database_manager.dispose_engine_connections()
+
+    # Trades are written to the trade log file by the parent process
+    strategy._trade_log_file = None
+
+    strategy.symbol = symbol
+    strategy.current_capital = strategy.starting_capital
+    strategy._trade_log = None
+    strategy._trade_log_rows = []
+    strategy._execute_strategy()
+
+    return strategy.get_trade_log(), strategy.current_capital
+
+
+@njit(cache=True)
+def _get_streaks(net_profit):
+    '''
+    Calculate the longest runs of consecutive win and loss trades.
+
+    A trade is a win if its net profit is positive and a loss if it is
+    negative, with breakeven trades ending both win and loss streaks.
+
+    Returns
+    -------
+    max_win_streak: int
+        The most consecutive win trades
+    max_loss_streak: int
+        The most consecutive loss trades
+    '''
+    max_win_streak = 0
+    max_loss_streak = 0
+    win_streak = 0
+    loss_streak = 0
+    for profit in net_profit:
+        if profit > 0:
+            win_streak += 1
+            loss_streak = 0
+            if win_streak > max_win_streak:
+                max_win_streak = win_streak
+        elif profit < 0:
+            loss_streak += 1
+            win_streak = 0
+            if loss_streak > max_loss_streak:
+                max_loss_streak = loss_streak
+        else:
+            win_streak = 0
+            loss_streak = 0
+    return max_win_streak, max_loss_streak
 
 
 class BaseStrategy(ABC):
@@ -14,6 +84,78 @@ class BaseStrategy(ABC):
     functionality.
     '''
 
+    # Attributes of all strategies, such that instances don't each create a
+    # __dict__, subclasses declare their own attributes in __slots__
+    __slots__ = (
+        # Database manager, logger and trade log
+        '_logger', '_database_manager', '_trade_log', '_trade_log_rows',
+        '_trade_log_file', '_backtest_stats', '_commission_rate',
+        # Backtest settings and capital
+        'strategy_name', 'symbol', 'backtest_start_time', 'backtest_end_time',
+        'entry_interval', 'trade_interval', 'params', 'starting_capital',
+        'risk_percentage', 'current_capital', 'use_BNB_for_commission',
+        'ending_capital',
+        # Backtest stats
+        'total_gross_profit', 'total_fees', 'total_net_profit',
+        'profit_factor', 'max_drawdown', 'total_trades', 'total_wins',
+        'total_losses', 'total_breakevens', 'max_win_streak',
+        'max_loss_streak', 'total_SL_exits', 'total_TSL_exits',
+        'total_EOT_exits', 'avg_win_profit_perc', 'avg_loss_profit_perc',
+        'max_win_profit_perc', 'max_loss_profit_perc', 'min_win_profit_perc',
+        'min_loss_profit_perc', 'win_rate_short', 'loss_rate_short',
+        'breakeven_rate_short', 'win_rate_long', 'loss_rate_long',
+        'breakeven_rate_long', 'win_rate', 'loss_rate', 'breakeven_rate',
+        'max_SL_hits_in_trading_block', 'max_SL_hits_in_trading_block_long',
+        'max_SL_hits_in_trading_block_short', 'min_SL_hits_in_trading_block',
+        'min_SL_hits_in_trading_block_long',
+        'min_SL_hits_in_trading_block_short', 'avg_SL_hits_in_trading_block',
+        'avg_SL_hits_in_trading_block_long',
+        'avg_SL_hits_in_trading_block_short', 'total_trades_long',
+        'total_trades_short', 'total_wins_long', 'total_wins_short',
+        'total_losses_long', 'total_losses_short', 'total_breakevens_long',
+        'total_breakevens_short', 'max_win_profit', 'max_win_profit_long',
+        'max_win_profit_perc_long', 'max_win_profit_short',
+        'max_win_profit_perc_short', 'min_win_profit', 'min_win_profit_long',
+        'min_win_profit_perc_long', 'min_win_profit_short',
+        'min_win_profit_perc_short', 'avg_win_profit', 'avg_win_profit_long',
+        'avg_win_profit_perc_long', 'avg_win_profit_short',
+        'avg_win_profit_perc_short', 'max_loss_profit', 'max_loss_profit_long',
+        'max_loss_profit_perc_long', 'max_loss_profit_short',
+        'max_loss_profit_perc_short', 'min_loss_profit',
+        'min_loss_profit_long', 'min_loss_profit_perc_long',
+        'min_loss_profit_short', 'min_loss_profit_perc_short',
+        'avg_loss_profit', 'avg_loss_profit_long', 'avg_loss_profit_perc_long',
+        'avg_loss_profit_short', 'avg_loss_profit_perc_short',
+        'total_SL_exits_long', 'total_SL_exits_short', 'total_TSL_exits_long',
+        'total_TSL_exits_short', 'total_TSL_win_exits',
+        'total_TSL_win_exits_long', 'total_TSL_win_exits_short',
+        'total_TSL_loss_exits', 'total_TSL_loss_exits_long',
+        'total_TSL_loss_exits_short', 'total_TP_exits', 'total_TP_exits_long',
+        'total_TP_exits_short', 'total_EOT_exits_long',
+        'total_EOT_exits_short', 'total_breakeven_streak'
+    )
+
+    # Columns of the trade log, in the order of the _log_trade parameters
+    _trade_log_columns = (
+        'symbol',
+        'interval',
+        'direction_long',
+        'trade_block_id',
+        'quantity',
+        'entry_time',
+        'entry_price',
+        'stop_loss_price',
+        'take_profit_price',
+        'exit_trigger',
+        'exit_time',
+        'exit_price',
+        'gross_profit',
+        'net_profit',
+        'fees',
+        'remaining_capital',
+        'drawdown'
+    )
+
     def __init__(self, log_level, database_manager, params):
 
         self._logger = Logger(logger_name=__file__,
@@ -35,6 +177,10 @@ class BaseStrategy(ABC):
         self.current_capital = None
         self.risk_percentage = None
         self.use_BNB_for_commission = None
+        self._commission_rate = None
+
+        # File that closed trades are written to as they are logged
+        self._trade_log_file = None
 
         # Metrics used for backtesting stats
         self.total_gross_profit = 0
@@ -60,10 +206,24 @@ class BaseStrategy(ABC):
 
     def backtest(self, starting_capital, risk_percentage, symbols, start_time,
                  end_time, entry_interval, trade_interval,
-                 use_BNB_for_commission):
+                 use_BNB_for_commission, max_workers=None,
+                 trade_log_path=None):
         '''
         Backtest trades using the strategy execution logic.
 
+        If trade_log_path is given, each trade is written to the file as a
+        JSON line when it is logged, such that the trade log of long
+        backtests can be reviewed without rendering it at the end.
+
+        Symbols are backtested in sequence with the capital carried over from
+        one symbol to the next. If max_workers is given, symbols are instead
+        backtested in parallel worker processes, each independently starting
+        from the starting capital, with the ending capital being the starting
+        capital plus the net profit of all symbols, such that the per trade
+        remaining capital and drawdown differ from a sequential backtest.
+        Worker processes are forked, so symbols are backtested in sequence
+        on platforms without the fork start method, e.g. Windows.
+
         For LONG trades:
 
         Start Trading Trigger Rules
@@ -117,7 +277,6 @@ class BaseStrategy(ABC):
         self._logger.info(f"starting backtest using {self.strategy_name} "
                           f"strategy between {start_time} and {end_time}")
 
-        symbols = json.loads(symbols)
         self.backtest_start_time = start_time
         self.backtest_end_time = end_time
         self.entry_interval = entry_interval
@@ -127,35 +286,34 @@ class BaseStrategy(ABC):
         self.current_capital = starting_capital
         self.use_BNB_for_commission = use_BNB_for_commission
 
-        # Initialise trade log dataframe
-        self._trade_log = DataFrame(
-            columns=[
-                'symbol',
-                'interval',
-                'direction_long',
-                'trade_block_id',
-                'quantity',
-                'entry_time',
-                'entry_price',
-                'stop_loss_price',
-                'take_profit_price',
-                'exit_trigger',
-                'exit_time',
-                'exit_price',
-                'gross_profit',
-                'net_profit',
-                'fees',
-                'remaining_capital',
-                'drawdown'
-            ]
-        )
+        # The commission rate doesn't change during a backtest, so get it
+        # once rather than for every trade
+        self._commission_rate = self._get_commission_rate(
+            use_BNB_for_commission)
 
-        # Backtest for all symbols
-        for symbol in symbols:
+        # Initialise the buffer of trades logged one at a time, the trade log
+        # dataframe is only created from them when it is next used
+        self._trade_log = None
+        self._trade_log_rows = []
 
-            self.symbol = symbol
-            self._execute_strategy()
-            self._logger.info(f"finished backtest for {symbol}")
+        if trade_log_path is not None:
+            self._trade_log_file = open(trade_log_path, 'w')
+
+        # Backtest for all symbols
+        try:
+            if (max_workers is None or len(symbols) < 2
+                    or 'fork' not in multiprocessing.get_all_start_methods()):
+                for symbol in symbols:
+
+                    self.symbol = symbol
+                    self._execute_strategy()
+                    self._logger.info(f"finished backtest for {symbol}")
+            else:
+                self._backtest_parallel(symbols, max_workers)
+        finally:
+            if self._trade_log_file is not None:
+                self._trade_log_file.close()
+                self._trade_log_file = None
 
         self._logger.info("finished backtesting")
 
@@ -163,10 +321,39 @@ class BaseStrategy(ABC):
         self._calculate_stats()
         return self.get_stats()
 
+    def _backtest_parallel(self, symbols, max_workers):
+
+        global _backtest_strategy
+        _backtest_strategy = self
+
+        # Fork the workers so they inherit the strategy and its database
+        # manager, with each worker loading its own klines from the database
+        try:
+            with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context('fork')
+            ) as executor:
+                results = list(executor.map(_backtest_symbol, symbols))
+        finally:
+            _backtest_strategy = None
+
+        trade_logs = [self.get_trade_log()]
+        for symbol, (trade_log, ending_capital) in zip(symbols, results):
+            trade_logs.append(trade_log)
+            if self._trade_log_file is not None:
+                for trade in trade_log.itertuples(index=False):
+                    self._write_trade(trade)
+            self.current_capital += ending_capital - self.starting_capital
+            self._logger.info(f"finished backtest for {symbol}")
+
+        self._trade_log = concat(trade_logs, ignore_index=True)
+        self.symbol = symbols[-1]
+
     def get_stats(self):
         return self._backtest_stats
 
     def get_trade_log(self):
+        self._materialize_trade_log()
         return self._trade_log
 
     @abstractmethod
@@ -179,21 +366,98 @@ class BaseStrategy(ABC):
                    gross_profit, net_profit, commission, remaining_capital,
                    drawdown):
 
-        self._trade_log.loc[len(self._trade_log)] = ([
+        # Buffer the trade rather than appending a row to the dataframe,
+        # which copies the whole trade log for every trade
+        trade = (
             symbol, interval, direction_long, trade_block_id, quantity,
             entry_time, entry_price, stop_loss_price, take_profit_price,
             exit_trigger, exit_time, exit_price, gross_profit, net_profit,
-            commission, remaining_capital, drawdown]
-        )
+            commission, remaining_capital, drawdown)
 
-    def _calculate_profit(self, quantity, direction_long, entry_price,
-                          exit_price, use_BNB_for_commission):
-        
-        # Calculate commission to be paid
-        if use_BNB_for_commission:
-            commission = quantity * (entry_price + exit_price) * 0.00075
+        self._trade_log_rows.append(trade)
+        if self._trade_log_file is not None:
+            self._write_trade(trade)
+
+    def _log_trades(self, symbol, interval, direction_long, trade_block_id,
+                    quantity, entry_time, entry_price, stop_loss_price,
+                    take_profit_price, exit_trigger, exit_time, exit_price,
+                    gross_profit, net_profit, commission, remaining_capital,
+                    drawdown):
+        '''
+        Log multiple trades at once, given as arrays of trade values.
+
+        Takes the same parameters as _log_trade, with each parameter either
+        an array with a value per trade or a single value for all trades,
+        such that strategies which simulate trades on arrays append them to
+        the trade log in one step rather than one row at a time.
+        '''
+        trades = DataFrame({
+            'symbol': symbol,
+            'interval': interval,
+            'direction_long': direction_long,
+            'trade_block_id': trade_block_id,
+            'quantity': quantity,
+            'entry_time': entry_time,
+            'entry_price': entry_price,
+            'stop_loss_price': stop_loss_price,
+            'take_profit_price': take_profit_price,
+            'exit_trigger': exit_trigger,
+            'exit_time': exit_time,
+            'exit_price': exit_price,
+            'gross_profit': gross_profit,
+            'net_profit': net_profit,
+            'fees': commission,
+            'remaining_capital': remaining_capital,
+            'drawdown': drawdown
+        }, columns=self._trade_log_columns)
+
+        if trades.empty:
+            return
+
+        # Keep the trade log in order with any buffered trades
+        self._materialize_trade_log()
+
+        if self._trade_log is None or self._trade_log.empty:
+            self._trade_log = trades
         else:
-            commission = quantity * (entry_price + exit_price) * 0.001
+            self._trade_log = concat([self._trade_log, trades],
+                                     ignore_index=True)
+
+        if self._trade_log_file is not None:
+            for trade in trades.itertuples(index=False):
+                self._write_trade(trade)
+
+    def _materialize_trade_log(self):
+
+        # Add the buffered trades to the trade log dataframe in one step,
+        # creating the dataframe if it doesn't exist yet
+        if self._trade_log is not None and not self._trade_log_rows:
+            return
+
+        trades = DataFrame.from_records(self._trade_log_rows,
+                                        columns=self._trade_log_columns)
+        self._trade_log_rows = []
+
+        if self._trade_log is None or self._trade_log.empty:
+            self._trade_log = trades
+        else:
+            self._trade_log = concat([self._trade_log, trades],
+                                     ignore_index=True)
+
+    def _write_trade(self, trade):
+
+        # Write the trade as a JSON line of the trade log columns, with
+        # times and NumPy ints written as strings
+        self._trade_log_file.write(json.dumps(
+            dict(zip(self._trade_log_columns, trade)), default=str) + '\n')
+
+    def _calculate_profit(self, quantity, direction_long, entry_price,
+                          exit_price):
+
+        # Calculate commission to be paid at the backtest commission rate
+        commission = (
+            quantity * (entry_price + exit_price) * self._commission_rate
+        )
 
         # Calculate gross and net profit
         gross_profit = quantity * (exit_price - entry_price)
@@ -201,21 +465,24 @@ class BaseStrategy(ABC):
 
         return gross_profit, net_profit, commission
 
-    def _calculate_order_quantity(self, entry_price, stop_loss_price):
+    def _get_commission_rate(self, use_BNB_for_commission):
 
-        # Calculate max quantity possible to buy using all account capital
-        max_quantity = float(self.current_capital / entry_price)
+        # Binance spot commission is discounted when paid using BNB
+        if use_BNB_for_commission:
+            return 0.00075
+        else:
+            return 0.001
 
-        # Calculate quantity based on SL distance and risk per trade
-        loss_price_difference = abs(entry_price - stop_loss_price)
-        loss_value_allowed = (
-            float(self.risk_percentage / 100) * self.current_capital
-        )
-        quantity = float(loss_value_allowed / loss_price_difference)
+    def _calculate_order_quantity(self, entry_price, stop_loss_price):
 
-        # Limit the quantity to the max possible
-        if quantity > max_quantity:
-            quantity = max_quantity
+        # Calculate quantity based on SL distance and risk per trade, limited
+        # to the max quantity possible to buy using all account capital
+        capital = self.current_capital
+        quantity = min(
+            self.risk_percentage / 100 * capital
+            / abs(entry_price - stop_loss_price),
+            capital / entry_price
+        )
 
         # TO DO: round quantity decimals to the allowed size based
         # on binance asset price resolution
@@ -224,6 +491,8 @@ class BaseStrategy(ABC):
 
     def _calculate_stats(self):
 
+        # Reset the stats which are only calculated when there are trades or
+        # aren't calculated yet, all other stats are always assigned below
         self.win_rate_short = None
         self.loss_rate_short = None
         self.breakeven_rate_short = None
@@ -233,57 +502,6 @@ class BaseStrategy(ABC):
         self.win_rate = None
         self.loss_rate = None
         self.breakeven_rate = None
-        self.max_win_profit = None
-        self.max_win_profit_perc = None
-        self.max_win_profit_long = None
-        self.max_win_profit_perc_long = None
-        self.max_win_profit_short = None
-        self.max_win_profit_perc_short = None
-        self.min_win_profit = None
-        self.min_win_profit_perc = None
-        self.min_win_profit_long = None
-        self.min_win_profit_perc_long = None
-        self.min_win_profit_short = None
-        self.min_win_profit_perc_short = None
-        self.avg_win_profit = None
-        self.avg_win_profit_perc = None
-        self.avg_win_profit_long = None
-        self.avg_win_profit_perc_long = None
-        self.avg_win_profit_short = None
-        self.avg_win_profit_perc_short = None
-        self.max_loss_profit = None
-        self.max_loss_profit_perc = None
-        self.max_loss_profit_long = None
-        self.max_loss_profit_perc_long = None
-        self.max_loss_profit_short = None
-        self.max_loss_profit_perc_short = None
-        self.min_loss_profit = None
-        self.min_loss_profit_perc = None
-        self.min_loss_profit_long = None
-        self.min_loss_profit_perc_long = None
-        self.min_loss_profit_short = None
-        self.min_loss_profit_perc_short = None
-        self.avg_loss_profit = None
-        self.avg_loss_profit_perc = None
-        self.avg_loss_profit_long = None
-        self.avg_loss_profit_perc_long = None
-        self.avg_loss_profit_short = None
-        self.avg_loss_profit_perc_short = None
-        self.total_SL_exits = None
-        self.total_SL_exits_long = None
-        self.total_SL_exits_short = None
-        self.total_TSL_exits = None
-        self.total_TSL_exits_long = None
-        self.total_TSL_exits_short = None
-        self.total_TSL_win_exits = None
-        self.total_TSL_win_exits_long = None
-        self.total_TSL_win_exits_short = None
-        self.total_TSL_loss_exits = None
-        self.total_TSL_loss_exits_long = None
-        self.total_TSL_loss_exits_short = None
-        self.total_EOT_exits = None
-        self.total_EOT_exits_long = None
-        self.total_EOT_exits_short = None
 
         self.max_SL_hits_in_trading_block = None
         self.max_SL_hits_in_trading_block_long = None
@@ -295,36 +513,49 @@ class BaseStrategy(ABC):
         self.avg_SL_hits_in_trading_block_long = None
         self.avg_SL_hits_in_trading_block_short = None
 
-        results = self._trade_log
-        results_long = results.query('direction_long == 1')
-        results_short = results.query('direction_long == 0')
-
-        # Get dataframes for wins, losses and breakevens
-        wins = results.query('net_profit > 0')
-        wins_long = wins.query('direction_long == 1')
-        wins_short = wins.query('direction_long == 0') 
-        losses = results.query('net_profit < 0')
-        losses_long = losses.query('direction_long == 1')
-        losses_short = losses.query('direction_long == 0') 
-        breakevens = results.query('net_profit == 0')
-        breakevens_long = breakevens.query('direction_long == 1')
-        breakevens_short = breakevens.query('direction_long == 0') 
+        results = self.get_trade_log()
+
+        # Get the trade log columns as arrays and build the boolean masks of
+        # each set of trades once, rather than querying the trade log for
+        # each set of trades
+        net_profit = results['net_profit'].to_numpy(dtype=float)
+        remaining_capital = results['remaining_capital'].to_numpy(dtype=float)
+        direction_long = results['direction_long'].to_numpy()
+        gross_profit = results['gross_profit'].to_numpy(dtype=float)
+        fees = results['fees'].to_numpy(dtype=float)
+        drawdown = results['drawdown'].to_numpy(dtype=float)
+
+        long = direction_long == 1
+        short = direction_long == 0
+        not_long = ~long
+
+        # Get masks for wins, losses and breakevens, and their long and
+        # short trades
+        wins = net_profit > 0
+        wins_long = wins & long
+        wins_short = wins & short
+        losses = net_profit < 0
+        losses_long = losses & long
+        losses_short = losses & short
+        breakevens = net_profit == 0
+        breakevens_long = breakevens & long
+        breakevens_short = breakevens & short
 
         # Calculate total trades
-        self.total_trades = len(results.index)
-        self.total_trades_long = len(results_long.index)
-        self.total_trades_short = len(results_short.index)
+        self.total_trades = net_profit.size
+        self.total_trades_long = np.count_nonzero(long)
+        self.total_trades_short = np.count_nonzero(short)
 
         # Calculate total wins and losses
-        self.total_wins = len(wins.index)
-        self.total_wins_long = len(wins_long.index)
-        self.total_wins_short = len(wins_short.index)
-        self.total_losses = len(losses.index)
-        self.total_losses_long = len(losses_long.index)
-        self.total_losses_short = len(losses_short.index)
-        self.total_breakevens = len(breakevens.index)
-        self.total_breakevens_long = len(breakevens_long.index)
-        self.total_breakevens_short = len(breakevens_short.index)
+        self.total_wins = np.count_nonzero(wins)
+        self.total_wins_long = np.count_nonzero(wins_long)
+        self.total_wins_short = np.count_nonzero(wins_short)
+        self.total_losses = np.count_nonzero(losses)
+        self.total_losses_long = np.count_nonzero(losses_long)
+        self.total_losses_short = np.count_nonzero(losses_short)
+        self.total_breakevens = np.count_nonzero(breakevens)
+        self.total_breakevens_long = np.count_nonzero(breakevens_long)
+        self.total_breakevens_short = np.count_nonzero(breakevens_short)
 
         # Calculate win, loss and breakeven rates
         if self.total_trades > 0:
@@ -351,91 +582,108 @@ class BaseStrategy(ABC):
             self.breakeven_rate_short = round(
                 self.total_breakevens_short / self.total_trades_short, 3)
 
+        # Calculate the net profit of each trade as a percentage of the
+        # account capital at the time of the trade, once for all trades
+        with np.errstate(divide='ignore', invalid='ignore'):
+            profit_percentage = (
+                net_profit / (remaining_capital - net_profit) * 100)
+
+        # Get the net profit and profit percentage of the win and loss trades
+        win_profits = (net_profit[wins], profit_percentage[wins])
+        win_profits_long = (net_profit[wins_long],
+                            profit_percentage[wins_long])
+        win_profits_short = (net_profit[wins_short],
+                             profit_percentage[wins_short])
+        loss_profits = (net_profit[losses], profit_percentage[losses])
+        loss_profits_long = (net_profit[losses_long],
+                             profit_percentage[losses_long])
+        loss_profits_short = (net_profit[losses_short],
+                              profit_percentage[losses_short])
+
         # Calculate max, min and avg profit values and percentages for wins
         self.max_win_profit, self.max_win_profit_perc = (
-            self._get_max_profit(wins))
+            self._get_max_profit(*win_profits))
         self.max_win_profit_long, self.max_win_profit_perc_long = (
-            self._get_max_profit(wins_long))
+            self._get_max_profit(*win_profits_long))
         self.max_win_profit_short, self.max_win_profit_perc_short = (
-            self._get_max_profit(wins_short))
+            self._get_max_profit(*win_profits_short))
         
         self.min_win_profit, self.min_win_profit_perc = (
-            self._get_min_profit(wins))
+            self._get_min_profit(*win_profits))
         self.min_win_profit_long, self.min_win_profit_perc_long = (
-            self._get_min_profit(wins_long))
+            self._get_min_profit(*win_profits_long))
         self.min_win_profit_short, self.min_win_profit_perc_short = (
-            self._get_min_profit(wins_short))
+            self._get_min_profit(*win_profits_short))
         
         self.avg_win_profit, self.avg_win_profit_perc = (
-            self._get_avg_profit(wins))
+            self._get_avg_profit(*win_profits))
         self.avg_win_profit_long, self.avg_win_profit_perc_long = (
-            self._get_avg_profit(wins_long))
+            self._get_avg_profit(*win_profits_long))
         self.avg_win_profit_short, self.avg_win_profit_perc_short = (
-            self._get_avg_profit(wins_short))
+            self._get_avg_profit(*win_profits_short))
         
         # Calculate max, min and avg profit values and percentages for losses
         self.max_loss_profit, self.max_loss_profit_perc = (
-            self._get_min_profit(losses))
+            self._get_min_profit(*loss_profits))
         self.max_loss_profit_long, self.max_loss_profit_perc_long = (
-            self._get_min_profit(losses_long))
+            self._get_min_profit(*loss_profits_long))
         self.max_loss_profit_short, self.max_loss_profit_perc_short = (
-            self._get_min_profit(losses_short))
+            self._get_min_profit(*loss_profits_short))
         
         self.min_loss_profit, self.min_loss_profit_perc = (
-            self._get_max_profit(losses))
+            self._get_max_profit(*loss_profits))
         self.min_loss_profit_long, self.min_loss_profit_perc_long = (
-            self._get_max_profit(losses_long))
+            self._get_max_profit(*loss_profits_long))
         self.min_loss_profit_short, self.min_loss_profit_perc_short = (
-            self._get_max_profit(losses_short))
+            self._get_max_profit(*loss_profits_short))
         
         self.avg_loss_profit, self.avg_loss_profit_perc = (
-            self._get_avg_profit(losses))
+            self._get_avg_profit(*loss_profits))
         self.avg_loss_profit_long, self.avg_loss_profit_perc_long = (
-            self._get_avg_profit(losses_long))
+            self._get_avg_profit(*loss_profits_long))
         self.avg_loss_profit_short, self.avg_loss_profit_perc_short = (
-            self._get_avg_profit(losses_short))
-
-        # Calculate max, min and average SL hits in trading block
-        SL_exits = results.query('exit_trigger == "STOP_LOSS"')
-        SL_exits_long = SL_exits.query('direction_long == 1')
-        SL_exits_short = SL_exits.query('direction_long != 1')
-        TSL_exits = results.query(
-            'exit_trigger == "TRAILING_STOP_LOSS"')
-        TSL_exits_long = TSL_exits.query('direction_long == 1')
-        TSL_exits_short = TSL_exits.query('direction_long != 1')
-        TSL_win_exits = TSL_exits.query('net_profit >= 0')
-        TSL_win_exits_long = TSL_win_exits.query('direction_long == 1')
-        TSL_win_exits_short = TSL_win_exits.query('direction_long != 1')
-        TSL_loss_exits = TSL_exits.query('net_profit < 0')
-        TSL_loss_exits_long = TSL_loss_exits.query('direction_long == 1')
-        TSL_loss_exits_short = TSL_loss_exits.query('direction_long != 1')
-        TP_exits = results.query(
-            'exit_trigger == "TAKE_PROFIT"')
-        TP_exits_long = TP_exits.query('direction_long == 1')
-        TP_exits_short = TP_exits.query('direction_long != 1')
-        EOTB_exits = results.query(
-            'exit_trigger == "END_OF_TRADING_BLOCK"')
-        EOTB_exits_long = EOTB_exits.query('direction_long == 1')
-        EOTB_exits_short = EOTB_exits.query('direction_long != 1')
-        
-        self.total_SL_exits = len(SL_exits.index)
-        self.total_SL_exits_long = len(SL_exits_long.index)
-        self.total_SL_exits_short = len(SL_exits_short.index)
-        self.total_TSL_exits = len(TSL_exits.index)
-        self.total_TSL_exits_long = len(TSL_exits_long.index)
-        self.total_TSL_exits_short = len(TSL_exits_short.index)
-        self.total_TSL_win_exits = len(TSL_win_exits.index)
-        self.total_TSL_win_exits_long = len(TSL_win_exits_long.index)
-        self.total_TSL_win_exits_short = len(TSL_win_exits_short.index)
-        self.total_TSL_loss_exits = len(TSL_loss_exits.index)
-        self.total_TSL_loss_exits_long = len(TSL_loss_exits_long.index)
-        self.total_TSL_loss_exits_short = len(TSL_loss_exits_short.index)
-        self.total_TP_exits = len(TP_exits.index)
-        self.total_TP_exits_long = len(TP_exits_long.index)
-        self.total_TP_exits_short = len(TP_exits_short.index)
-        self.total_EOT_exits = len(EOTB_exits.index)
-        self.total_EOT_exits_long = len(EOTB_exits_long.index)
-        self.total_EOT_exits_short = len(EOTB_exits_short.index)
+            self._get_avg_profit(*loss_profits_short))
+
+        # Get masks for each exit trigger, factorizing the exit triggers
+        # once such that each mask compares integer codes rather than
+        # strings. Missing exit triggers are given their own code
+        exit_trigger_codes, exit_triggers = factorize(
+            results['exit_trigger'], use_na_sentinel=False)
+        SL_code, TSL_code, TP_code, EOTB_code = exit_triggers.get_indexer([
+            "STOP_LOSS",
+            "TRAILING_STOP_LOSS",
+            "TAKE_PROFIT",
+            "END_OF_TRADING_BLOCK"
+        ])
+        SL_exits = exit_trigger_codes == SL_code
+        TSL_exits = exit_trigger_codes == TSL_code
+        TSL_win_exits = TSL_exits & (net_profit >= 0)
+        TSL_loss_exits = TSL_exits & losses
+        TP_exits = exit_trigger_codes == TP_code
+        EOTB_exits = exit_trigger_codes == EOTB_code
+
+        self.total_SL_exits = np.count_nonzero(SL_exits)
+        self.total_SL_exits_long = np.count_nonzero(SL_exits & long)
+        self.total_SL_exits_short = np.count_nonzero(SL_exits & not_long)
+        self.total_TSL_exits = np.count_nonzero(TSL_exits)
+        self.total_TSL_exits_long = np.count_nonzero(TSL_exits & long)
+        self.total_TSL_exits_short = np.count_nonzero(TSL_exits & not_long)
+        self.total_TSL_win_exits = np.count_nonzero(TSL_win_exits)
+        self.total_TSL_win_exits_long = np.count_nonzero(
+            TSL_win_exits & long)
+        self.total_TSL_win_exits_short = np.count_nonzero(
+            TSL_win_exits & not_long)
+        self.total_TSL_loss_exits = np.count_nonzero(TSL_loss_exits)
+        self.total_TSL_loss_exits_long = np.count_nonzero(
+            TSL_loss_exits & long)
+        self.total_TSL_loss_exits_short = np.count_nonzero(
+            TSL_loss_exits & not_long)
+        self.total_TP_exits = np.count_nonzero(TP_exits)
+        self.total_TP_exits_long = np.count_nonzero(TP_exits & long)
+        self.total_TP_exits_short = np.count_nonzero(TP_exits & not_long)
+        self.total_EOT_exits = np.count_nonzero(EOTB_exits)
+        self.total_EOT_exits_long = np.count_nonzero(EOTB_exits & long)
+        self.total_EOT_exits_short = np.count_nonzero(EOTB_exits & not_long)
 
         # self.max_SL_hits_in_trading_block = None
         # self.max_SL_hits_in_trading_block_long = None
@@ -447,29 +695,31 @@ class BaseStrategy(ABC):
         # self.avg_SL_hits_in_trading_block_long = None
         # self.avg_SL_hits_in_trading_block_short = None
 
-        # Calculate max drawdown
-        self.max_drawdown = results['drawdown'].max()
+        # Calculate max drawdown, skipping NaN values as the pandas max did
+        self.max_drawdown = np.nanmax(drawdown) if drawdown.size else np.nan
 
         # Update ending capital var
         self.ending_capital = self.current_capital
         
-        # Calculate profit factor
-        losses_total_profit = losses['net_profit'].sum()
+        # Calculate profit factor, summing the clipped net profits rather
+        # than copying out the win and loss trades
+        losses_total_profit = np.nansum(np.minimum(net_profit, 0))
         if losses_total_profit:
             self.profit_factor = round(
-                abs(wins['net_profit'].sum() / losses_total_profit), 3)
+                abs(np.nansum(np.maximum(net_profit, 0))
+                    / losses_total_profit), 3)
         else:
             self.profit_factor = 'undefined, no losses occurred'
 
         # Calculate total profit
-        self.total_gross_profit = results['gross_profit'].sum()
-        self.total_net_profit = results['net_profit'].sum()
+        self.total_gross_profit = np.nansum(gross_profit)
+        self.total_net_profit = np.nansum(net_profit)
 
         # Calculate total commission fees
-        self.total_fees = results['fees'].sum()
+        self.total_fees = np.nansum(fees)
 
-        self.max_win_streak = 0
-        self.max_loss_streak = 0
+        # Calculate the longest win and loss streaks in trade log order
+        self.max_win_streak, self.max_loss_streak = _get_streaks(net_profit)
         self.total_breakeven_streak = 0
 
         # self.average_time_held_per_trade = 0
@@ -521,24 +771,20 @@ class BaseStrategy(ABC):
             'min_loss_return': self.min_loss_profit_perc
         }
 
-    def _get_max_profit(self, trades):
+    def _get_max_profit(self, net_profit, profit_percentage):
         '''
-        Calculate the max profit from a dataframe of trades.
+        Calculate the max profit from arrays of trade values.
 
         The function gets the max profit value in the account currency
         and as a percentage of the account capital at the time of the trade.
 
-        REQUIREMENTS
-        ------------
-        The trades dataframe must contain 'profit' and 'remaining_capital'
-        columns, where 'profit' is the net profit of the trade entry and
-        'remaining_capital' is the account capital remaining after the trade
-        completed.
-
         PARAMETERS
         ----------
-        trades: pandas.DataFrame
-            A dataframe containing trades
+        net_profit: numpy.ndarray
+            The net profit of each trade
+        profit_percentage: numpy.ndarray
+            The net profit of each trade as a percentage of the account
+            capital at the time of the trade
 
         RETURNS
         -------
@@ -548,40 +794,33 @@ class BaseStrategy(ABC):
             The max profit value as a percentage of the account capital at
             the time of the trade
         '''
-        if len(trades.index) == 0:
+        if net_profit.size == 0:
             return None, None
 
-        max_profit = trades['net_profit'].max()
-        max_profit_percentage = None
-
-        max_profit_trades = trades.query('net_profit == @max_profit')
+        # Get the max profit, and the max profit percentage of the trades
+        # with that profit, as trades with equal profit may have been made
+        # with different account capital
+        max_profit = net_profit.max()
         max_profit_percentage = round(
-            (max_profit_trades.net_profit / (
-                max_profit_trades.remaining_capital
-                - max_profit_trades.net_profit
-                )).max() * 100, 2)
+            profit_percentage[net_profit == max_profit].max(), 2)
 
         max_profit = round(max_profit, 2)
         return max_profit, max_profit_percentage
 
-    def _get_min_profit(self, trades):
+    def _get_min_profit(self, net_profit, profit_percentage):
         '''
-        Calculate the min profit from a dataframe of trades.
+        Calculate the min profit from arrays of trade values.
 
         The function gets the min profit value in the account currency
         and as a percentage of the account capital at the time of the trade.
 
-        REQUIREMENTS
-        ------------
-        The trades dataframe must contain 'profit' and 'remaining_capital'
-        columns, where 'profit' is the net profit of the trade entry and
-        'remaining_capital' is the account capital remaining after the trade
-        completed.
-
         PARAMETERS
         ----------
-        trades: pandas.DataFrame
-            A dataframe containing trades
+        net_profit: numpy.ndarray
+            The net profit of each trade
+        profit_percentage: numpy.ndarray
+            The net profit of each trade as a percentage of the account
+            capital at the time of the trade
 
         RETURNS
         -------
@@ -590,61 +829,47 @@ class BaseStrategy(ABC):
         min_profit_percentage: float
             The min profit value as a percentage of the account capital at
             the time of the trade
-        '''        
-        if len(trades.index) == 0:
+        '''
+        if net_profit.size == 0:
             return None, None
 
-        min_profit = trades['net_profit'].min()
-        min_profit_percentage = None
-
-        min_profit_trades = trades.query('net_profit == @min_profit')
+        # Get the min profit, and the max profit percentage of the trades
+        # with that profit, as trades with equal profit may have been made
+        # with different account capital
+        min_profit = net_profit.min()
         min_profit_percentage = round(
-            (min_profit_trades.net_profit / (
-                min_profit_trades.remaining_capital
-                - min_profit_trades.net_profit
-                )).max() * 100, 2)
+            profit_percentage[net_profit == min_profit].max(), 2)
 
         min_profit = round(min_profit, 2)
         return min_profit, min_profit_percentage
 
-    def _get_avg_profit(self, trades):
+    def _get_avg_profit(self, net_profit, profit_percentage):
         '''
-        Calculate the average profit from a dataframe of trades.
+        Calculate the average profit from arrays of trade values.
 
         The function gets the avg profit value in the account currency
         and as a percentage of the account capital at the time of the trade.
 
-        REQUIREMENTS
-        ------------
-        The trades dataframe must contain 'profit' and 'remaining_capital'
-        columns, where 'profit' is the net profit of the trade entry and
-        'remaining_capital' is the account capital remaining after the trade
-        completed.
-
         PARAMETERS
         ----------
-        trades: pandas.DataFrame
-            A dataframe containing trades
+        net_profit: numpy.ndarray
+            The net profit of each trade
+        profit_percentage: numpy.ndarray
+            The net profit of each trade as a percentage of the account
+            capital at the time of the trade
 
         RETURNS
         -------
+        avg_profit: float
+            The average profit value of all trades
         avg_profit_percentage: float
             The average profit value as a percentage of the account capital at
             the time of the trade
         '''
-        if len(trades.index) == 0:
+        if net_profit.size == 0:
             return None, None
         
-        avg_profit = round(trades['net_profit'].mean(), 2)
-        avg_profit_percentage = None
-
-        trade_profit_percentage = (
-            (trades.net_profit / (
-                trades.remaining_capital
-                - trades.net_profit
-                )) * 100)
-        
-        avg_profit_percentage = round(
-            trade_profit_percentage.mean(), 2)
+        avg_profit = round(net_profit.mean(), 2)
+        avg_profit_percentage = round(profit_percentage.mean(), 2)
 
         return avg_profit, avg_profit_percentage
@@ -0,0 +1,17 @@
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        '''
+        Fallback for numba.njit when numba is not installed.
+
+        Returns the decorated function unchanged such that it runs as plain
+        Python, supporting use as both @njit and @njit(...).
+        '''
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
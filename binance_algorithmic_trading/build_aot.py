@@ -0,0 +1,42 @@
+#!python3
+'''
+Ahead-of-time compile the strategy kernels with numba.pycc.
+
+Running this script builds the strategy_kernels extension module next to
+app.py. When the module is importable the strategies use the compiled
+kernels instead of JIT compiling the njit kernels on every app.py run,
+removing the JIT warmup time from short backtests.
+
+Note numba.pycc is deprecated by numba and will be removed in a future
+release, after which the strategies only use the njit kernels. Requires
+numba, e.g. poetry install -E speedups.
+
+Usage: python build_aot.py
+'''
+import os
+from numba.pycc import CC
+from binance_algorithmic_trading.strategies import EMAX_kernels
+
+
+def main():
+
+    cc = CC('strategy_kernels')
+    cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+    # Export the kernels with explicit signatures, using the Python
+    # functions wrapped by njit
+    cc.export(
+        'rolling_mean',
+        'f8[:](f8[:], i8)'
+    )(EMAX_kernels.rolling_mean.py_func)
+    cc.export(
+        'emax_loop',
+        'Tuple((i8[:], i8[:], f8[:], f8[:], f8[:], f8[:], f8[:], f8[:]))'
+        '(f8[:], f8[:], f8[:], f8, f8, f8)'
+    )(EMAX_kernels.emax_loop.py_func)
+
+    cc.compile()
+
+
+if __name__ == "__main__":
+    main()
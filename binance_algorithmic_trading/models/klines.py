@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
 from .base import Base
@@ -8,6 +9,12 @@ class Kline(Base):
 
     __tablename__ = "klines"
 
+    # Index for querying klines of a given symbol and interval by open time
+    __table_args__ = (
+        Index('ix_klines_symbol_interval_open_time',
+              'symbol', 'interval', 'open_time'),
+    )
+
     # Columns for storing the id, symbol and time interval
     # for a given entry of kline data
     id: Mapped[int] = mapped_column(primary_key=True)
@@ -0,0 +1,143 @@
+import logging
+import numpy as np
+import pytest
+from binance_algorithmic_trading.strategies.base_strategy import (
+    BaseStrategy, _get_streaks)
+
+
+class _Strategy(BaseStrategy):
+
+    __slots__ = ()
+
+    def _execute_strategy(self):
+        pass
+
+
+# (direction_long, exit_trigger, net_profit, remaining_capital, drawdown)
+# of trades made from a starting capital of 1000, with a commission of 1
+# per trade
+_trades = (
+    (1, 'TAKE_PROFIT', 100, 1100, 0),
+    (1, 'STOP_LOSS', -300, 800, 300),
+    (0, 'TRAILING_STOP_LOSS', 100, 900, 200),
+    (0, 'END_OF_TRADING_BLOCK', 0, 900, 200),
+    (1, 'TRAILING_STOP_LOSS', -50, 850, 250),
+    (0, 'STOP_LOSS', -300, 550, 550),
+)
+
+
+def _log_trades(strategy, trades):
+    for trade_block_id, (direction_long, exit_trigger, net_profit,
+                         remaining_capital, drawdown) in enumerate(trades):
+        strategy._log_trade(
+            'BTCUSDT', '30m', direction_long, trade_block_id, 1.0,
+            None, 100.0, 90.0, 120.0, exit_trigger, None, 110.0,
+            net_profit + 1, net_profit, 1, remaining_capital, drawdown)
+
+
+@pytest.fixture
+def strategy():
+    strategy = _Strategy(log_level=logging.WARNING, database_manager=None,
+                         params='20:50')
+    strategy.starting_capital = 1000
+    strategy._trade_log = None
+    strategy._trade_log_rows = []
+    return strategy
+
+
+def test_calculate_stats_counts(strategy):
+    _log_trades(strategy, _trades)
+    strategy._calculate_stats()
+
+    assert strategy.total_trades == 6
+    assert strategy.total_trades_long == 3
+    assert strategy.total_trades_short == 3
+    assert strategy.total_wins == 2
+    assert strategy.total_wins_long == 1
+    assert strategy.total_wins_short == 1
+    assert strategy.total_losses == 3
+    assert strategy.total_losses_long == 2
+    assert strategy.total_losses_short == 1
+    assert strategy.total_breakevens == 1
+    assert strategy.total_breakevens_long == 0
+    assert strategy.total_breakevens_short == 1
+    assert strategy.win_rate == 0.333
+    assert strategy.loss_rate == 0.5
+    assert strategy.breakeven_rate == 0.167
+    assert strategy.win_rate_long == 0.333
+    assert strategy.breakeven_rate_short == 0.333
+
+
+def test_calculate_stats_exit_triggers(strategy):
+    _log_trades(strategy, _trades)
+    strategy._calculate_stats()
+
+    assert strategy.total_SL_exits == 2
+    assert strategy.total_SL_exits_long == 1
+    assert strategy.total_SL_exits_short == 1
+    assert strategy.total_TSL_exits == 2
+    assert strategy.total_TSL_exits_long == 1
+    assert strategy.total_TSL_exits_short == 1
+    assert strategy.total_TSL_win_exits == 1
+    assert strategy.total_TSL_win_exits_short == 1
+    assert strategy.total_TSL_loss_exits == 1
+    assert strategy.total_TSL_loss_exits_long == 1
+    assert strategy.total_TP_exits == 1
+    assert strategy.total_TP_exits_long == 1
+    assert strategy.total_EOT_exits == 1
+    assert strategy.total_EOT_exits_short == 1
+
+
+def test_calculate_stats_profits(strategy):
+    _log_trades(strategy, _trades)
+    strategy._calculate_stats()
+
+    assert strategy.total_net_profit == -450
+    assert strategy.total_gross_profit == -444
+    assert strategy.total_fees == 6
+    assert strategy.max_drawdown == 550
+    assert strategy.profit_factor == 0.308
+
+    # Both wins have a profit of 100, the percentage is the max of the
+    # trades with that profit, 100 of 800 capital rather than of 1000
+    assert strategy.max_win_profit == 100
+    assert strategy.max_win_profit_perc == 12.5
+    assert strategy.min_win_profit == 100
+    assert strategy.min_win_profit_perc == 12.5
+    assert strategy.avg_win_profit == 100
+    assert strategy.avg_win_profit_perc == 11.25
+    assert strategy.max_win_profit_long == 100
+    assert strategy.max_win_profit_perc_long == 10.0
+
+    assert strategy.max_loss_profit == -300
+    assert strategy.max_loss_profit_perc == -27.27
+    assert strategy.min_loss_profit == -50
+    assert strategy.min_loss_profit_perc == -5.56
+    assert strategy.max_loss_profit_short == -300
+    assert strategy.max_loss_profit_perc_short == -35.29
+
+    assert strategy.max_win_streak == 1
+    assert strategy.max_loss_streak == 2
+
+
+def test_calculate_stats_without_losses(strategy):
+    _log_trades(strategy, _trades[:1])
+    strategy._calculate_stats()
+
+    assert strategy.profit_factor == 'undefined, no losses occurred'
+    assert strategy.max_loss_profit is None
+    assert strategy.win_rate_short is None
+
+
+def test_get_streaks():
+    net_profit = np.array([1.0, 2.0, 0.0, 3.0, -1.0, -2.0, -3.0, 4.0])
+    assert _get_streaks(net_profit) == (2, 3)
+
+
+def test_get_streaks_breakevens_end_streaks():
+    net_profit = np.array([-1.0, 0.0, -1.0, 1.0, 0.0, 1.0])
+    assert _get_streaks(net_profit) == (1, 1)
+
+
+def test_get_streaks_no_trades():
+    assert _get_streaks(np.array([], dtype=float)) == (0, 0)
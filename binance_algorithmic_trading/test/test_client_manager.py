@@ -0,0 +1,67 @@
+import time
+import logging
+import pytest
+from binance_algorithmic_trading.config import BinanceConfig
+from binance_algorithmic_trading.client_manager import ClientManager
+
+
+class _ClientManager(ClientManager):
+
+    # Klines requests return their start time after a delay, such that
+    # later requests complete before earlier ones
+    def get_klines(self, symbol, interval, start_time, end_time, limit):
+        self.klines_requests += 1
+        time.sleep(0.01 * (5 - start_time))
+        return start_time
+
+
+@pytest.fixture
+def client_manager():
+    client_manager = _ClientManager(
+        log_level=logging.WARNING,
+        config=BinanceConfig(
+            BASE_URL='https://api.binance.com',
+            API_KEY='',
+            SECRET_KEY='',
+            SYMBOLS=['BTCUSDT'],
+            INTERVALS=['1m']
+        )
+    )
+    client_manager.klines_requests = 0
+    yield client_manager
+    client_manager.close()
+
+
+def test_iter_klines_batch_yields_in_request_order(client_manager):
+    requests = [('BTCUSDT', '1m', start_time, None, 1)
+                for start_time in range(5)]
+    assert list(client_manager.iter_klines_batch(requests, max_workers=4)) \
+        == [0, 1, 2, 3, 4]
+
+
+def test_take_weight_clamps_weight_above_limit(client_manager):
+    # A depth request heavier than the limit of a decreased budget is made
+    # once no other weight is used
+    client_manager._weight_budget_1m = 150
+    assert client_manager._take_weight(250, 'depth') is None
+    assert client_manager._take_weight(250, 'depth') is not None
+
+
+def test_update_weights_ignores_invalid_weights(client_manager):
+    client_manager._update_weights({'x-mbx-used-weight': '10',
+                                    'x-mbx-used-weight-1m': '10'})
+    client_manager._update_weights({'x-mbx-used-weight': 'invalid',
+                                    'x-mbx-used-weight-1m': '20'})
+    assert client_manager._x_mbx_used_weight == 10
+    assert client_manager._x_mbx_used_weight_1m == 10
+
+
+def test_iter_klines_batch_close_stops_requests(client_manager):
+    requests = [('BTCUSDT', '1m', 4, None, 1) for _ in range(20)]
+    klines_pages = client_manager.iter_klines_batch(requests, max_workers=1)
+    assert next(klines_pages) == 4
+    klines_pages.close()
+
+    # Only the request in flight when iteration stopped is still made
+    client_manager.close()
+    assert client_manager.klines_requests <= 2
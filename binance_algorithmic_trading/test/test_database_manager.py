@@ -0,0 +1,54 @@
+import logging
+import numpy as np
+import pytest
+from binance_algorithmic_trading.config import DatabaseConfig
+from binance_algorithmic_trading.database_manager import DatabaseManager
+
+
+class _ClientManager():
+
+    # Klines requests return a page with the window start time as the open
+    # time, or None for the windows to fail
+    def __init__(self, failed_start_times):
+        self.failed_start_times = failed_start_times
+        self.closed = False
+
+    def iter_klines_batch(self, requests):
+        try:
+            for symbol, interval, start_time, end_time, limit in requests:
+                if start_time in self.failed_start_times:
+                    yield None
+                else:
+                    yield {'open_time': np.array([start_time])}
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def database_manager(monkeypatch):
+    database_manager = DatabaseManager(
+        log_level=logging.WARNING,
+        config=DatabaseConfig(DB_CONFIG='sqlite:///klines.db',
+                              KLINES_BATCH_SIZE=1)
+    )
+    saved_open_times = []
+    monkeypatch.setattr(
+        database_manager, '_save_klines',
+        lambda symbol, interval, klines:
+            saved_open_times.extend(klines['open_time'].tolist()))
+    database_manager.saved_open_times = saved_open_times
+    return database_manager
+
+
+def test_get_klines_forward_stops_at_failed_window(database_manager,
+                                                   monkeypatch):
+    # Three windows of one 1m kline each, the second window fails
+    monkeypatch.setattr('time.time_ns', lambda: 6 * 60000 * 1000000)
+    client_manager = _ClientManager(failed_start_times={180000})
+    database_manager._get_klines_forward('BTCUSDT', '1m', client_manager,
+                                         end_time_ms_since_utc=0,
+                                         klines_max_limit=1)
+
+    # Only the window before the failed window is saved
+    assert database_manager.saved_open_times == [60000]
+    assert client_manager.closed